@@ -1,22 +1,88 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import datetime
 import sys
-from PyQt5.QtCore import (Qt, QRectF, pyqtSignal, pyqtSlot)
+from PyQt5.QtCore import (Qt, QPointF, QPropertyAnimation, QRectF, QThread,
+    QTimer, pyqtSignal, pyqtSlot)
 from PyQt5.QtWidgets import (QApplication, QGraphicsScene, QGraphicsView,
-    QGraphicsObject, QHBoxLayout, QVBoxLayout, QPushButton,
-    QLabel, QWidget, QRadioButton, QButtonGroup, 
+    QGraphicsItem, QGraphicsObject, QHBoxLayout, QVBoxLayout, QFormLayout, QPushButton,
+    QLabel, QWidget, QRadioButton, QButtonGroup, QSpinBox,
     QDialog, QDialogButtonBox, QMessageBox)
-from PyQt5.QtGui import (QPainter)
+from PyQt5.QtGui import (QFont, QPainter, QKeySequence)
 
-import queue
+import engine
+from engine import (MAX_DEPTH, TIME_LIMIT, WOLF_DIRECTION, SHEEP_DIRECTION,
+    INF, WIN, SIGN, Engine, Game, Geometry, Limits, TraceLog)
+from book import Book
+from record import RECORD_PATH, Record, appendRecord
+from tablebase import Tablebase
+
+ANIMATION_MS = 150  # Figūras pārvietošanas animācijas ilgums
+
+class SearchThread(QThread):
+    # Datora gājiena meklēšana ārpus grafiskās saskarnes pavediena
+    # Rezultātu nododam ar signālu (meklēšanas numurs, tips, gājiens,
+    # novērtējums, statistika)
+    moveFound = pyqtSignal(int, str, int, int, object, object)
+
+    def __init__(self, engine, search_id, position, type, limits):
+        super().__init__()
+        self.engine = engine
+        self.search_id = search_id
+        self.position = position
+        self.type = type
+        self.limits = limits
+
+    def run(self):
+        move, score, stats = self.engine.search(
+            self.position, self.type, self.limits)
+        if move is not None:
+            self.moveFound.emit(self.search_id, self.type, move[0], move[1],
+                                score, stats)
+
+
+class PonderThread(QThread):
+    # Dators domā spēlētāja gājiena laikā
+    # Rezultāti paliek dzinējā (Engine.ponder_results)
+
+    def __init__(self, engine, position, type, limits):
+        super().__init__()
+        self.engine = engine
+        self.position = position
+        self.type = type
+        self.limits = limits
+
+    def run(self):
+        self.engine.ponder(self.position, self.type, self.limits)
+
+
+class AnalysisThread(QThread):
+    # Spēlētāja gājienu analīze (Engine.analyse) padomu režīmā
+    # Katru novērtēto gājienu nododam ar signālu (analīzes numurs, dziļums,
+    # no, uz, novērtējums no vilku viedokļa)
+    moveScored = pyqtSignal(int, int, int, int, int)
+
+    def __init__(self, engine, analysis_id, position, type):
+        super().__init__()
+        self.engine = engine
+        self.analysis_id = analysis_id
+        self.position = position
+        self.type = type
+
+    def run(self):
+        for depth, move, score, pv in self.engine.analyse(
+                self.position, self.type):
+            self.moveScored.emit(self.analysis_id, depth, move[0], move[1],
+                                 score)
 
-N = 8
-MAX_DEPTH = 6
 
 class MainWindow(QWidget):
     # Galvenais logs
-    def __init__(self):
+    # trace - faila ceļš datora gājienu meklēšanas statistikai (.csv vai JSON)
+    # record - spēļu ierakstu fails (record.py); None - nesaglabājam
+    def __init__(self, trace=None, record=RECORD_PATH):
         super().__init__()
         self.setWindowTitle("Game")
 
@@ -24,41 +90,79 @@ class MainWindow(QWidget):
         self.computer_score = 0
         
         self.board = Board()
+        self.board.record_path = record
+        if trace:
+            self.board.trace = TraceLog(trace)
         
         top_layout = QHBoxLayout()
         
         button = QPushButton("New")
         button.clicked.connect(self.onNew)
 
+        # Gājienu atcelšana un atkārtošana (Ctrl+Z / Ctrl+Shift+Z)
+        undo_button = QPushButton("Undo")
+        undo_button.setShortcut(QKeySequence.Undo)
+        undo_button.clicked.connect(self.board.undo)
+        redo_button = QPushButton("Redo")
+        redo_button.setShortcut(QKeySequence.Redo)
+        redo_button.clicked.connect(self.board.redo)
+
+        # Padomi: datora novērtējums katram spēlētāja gājienam
+        hints_button = QPushButton("Hints")
+        hints_button.setCheckable(True)
+        hints_button.setShortcut("Ctrl+H")
+        hints_button.toggled.connect(self.board.setAnalysis)
+
         self.label = QLabel()
 
         top_layout.addWidget(button)
+        top_layout.addWidget(undo_button)
+        top_layout.addWidget(redo_button)
+        top_layout.addWidget(hints_button)
         top_layout.addStretch()
         top_layout.addWidget(self.label)
 
+        # Pēdējās meklēšanas statistika
+        self.status = QLabel()
+
         layout = QVBoxLayout()
         layout.addLayout(top_layout)
         layout.addWidget(self.board)
+        layout.addWidget(self.status)
 
         self.setLayout(layout)
         self.updateScore()
 
         self.board.playerWin.connect(self.playerWin)
         self.board.computerWin.connect(self.computerWin)
+        self.board.searchFinished.connect(self.showStats)
 
         self.board.restart("sheep")
 
+    def closeEvent(self, event):
+        # Aizverot logu, apturam datora meklēšanu un saglabājam spēli
+        self.board.cancelSearch()
+        self.board.saveGame()
+        if self.board.trace is not None:
+            self.board.trace.close()
+        super().closeEvent(event)
+
     @pyqtSlot()
     def onNew(self):
         # Sākam jaunu spēli
-        dialog = Dialog()
+        self.board.cancelSearch()
+        geometry = self.board.board_geometry
+        dialog = Dialog(geometry.n, geometry.wolf_count)
         dialog.setWindowModality(Qt.ApplicationModal)
         dialog.exec_()
 
+        geometry = Geometry.get(dialog.size_box.value(),
+                                dialog.wolfs_box.value())
         if dialog.sheep_button.isChecked():
-            self.board.restart("sheep")
+            self.board.restart("sheep", geometry)
         else:
-            self.board.restart("wolfs")
+            self.board.restart("wolfs", geometry)
+        self.adjustSize()
     
     @pyqtSlot()
     def playerWin(self):
@@ -72,16 +176,20 @@ class MainWindow(QWidget):
         self.updateScore()
         QMessageBox.information(self, "Victory", "Computer win!")
 
+    @pyqtSlot(object)
+    def showStats(self, stats):
+        self.status.setText(str(stats))
+
     def updateScore(self):
         self.label.setText(f'{self.player_score}:{self.computer_score}')
 
 class Dialog(QDialog):
-    # Spēlētāja atlases logs
-    def __init__(self):
+    # Spēlētāja, dēļa izmēra un vilku skaita atlases logs
+    def __init__(self, size=engine.N, wolf_count=engine.N // 2):
         super().__init__()
-        self.initUI()
+        self.initUI(size, wolf_count)
 
-    def initUI(self):
+    def initUI(self, size, wolf_count):
         self.setWindowTitle("Dialog")
         self.setGeometry(100, 100, 200, 100)
 
@@ -93,6 +201,18 @@ class Dialog(QDialog):
         group.addButton(self.sheep_button)
         group.addButton(self.wolfs_button)
 
+        self.size_box = QSpinBox()
+        self.size_box.setRange(4, 16)
+        self.size_box.setValue(size)
+        self.wolfs_box = QSpinBox()
+        self.setMaxWolfs(size)
+        self.wolfs_box.setValue(wolf_count)
+        self.size_box.valueChanged.connect(self.sizeChanged)
+
+        form = QFormLayout()
+        form.addRow("Board size", self.size_box)
+        form.addRow("Wolfs", self.wolfs_box)
+
         buttonBox = QDialogButtonBox(QDialogButtonBox.Ok)
 
         buttonBox.accepted.connect(self.accept)
@@ -102,8 +222,18 @@ class Dialog(QDialog):
 
         vbox.addWidget(self.sheep_button)
         vbox.addWidget(self.wolfs_button)
+        vbox.addLayout(form)
         vbox.addWidget(buttonBox)
         self.setLayout(vbox)
+
+    def setMaxWolfs(self, size):
+        # Vilki aizņem ne vairāk kā pusi no tumšajām šūnām
+        self.wolfs_box.setRange(1, size * size // 2 // 2)
+
+    @pyqtSlot(int)
+    def sizeChanged(self, size):
+        self.setMaxWolfs(size)
+        self.wolfs_box.setValue(size // 2)
  
 
 class Cell(QGraphicsObject):
@@ -119,16 +249,41 @@ class Cell(QGraphicsObject):
         self.y = row * size
         self.w = size
         self.h = size
+        self.brush = None
+        self.hint = None    # Analīzes novērtējuma teksts
+        self.best = False   # Labākais gājiens analīzē
+
+        # Rūts mainās tikai izgaismojot; attēlu glabājam kešā
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
     def setBrush(self, brush):
-        self.brush = brush
+        # Pārzīmējam tikai šo rūti un tikai tad, ja krāsa mainījusies
+        if brush != self.brush:
+            self.brush = brush
+            self.update()
+
+    def setHint(self, hint, best=False):
+        # Novērtējums virs rūts; None - bez novērtējuma
+        if (hint, best) != (self.hint, self.best):
+            self.hint = hint
+            self.best = best
+            self.update()
 
     def boundingRect(self):
-        return QRectF(self.x, self.y, self.w, self.h)
+        # Puse no apmales līnijas iziet ārpus rūts
+        return QRectF(self.x - 0.5, self.y - 0.5, self.w + 1, self.h + 1)
 
     def paint(self, painter, option, widget):
         painter.setBrush(self.brush)
         painter.drawRect(self.x, self.y, self.w, self.h)
+        if self.hint is not None:
+            font = QFont()
+            font.setPixelSize(max(8, self.w // 4))
+            font.setBold(self.best)
+            painter.setFont(font)
+            painter.setPen(Qt.yellow if self.best else Qt.white)
+            painter.drawText(QRectF(self.x, self.y, self.w, self.h),
+                             Qt.AlignCenter, self.hint)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -149,51 +304,49 @@ class Circle(QGraphicsObject):
         self.w = 2 * self.radius
         self.h = 2 * self.radius
 
+        # Figūru zīmējam savās koordinātēs un pārvietojam ar setPos,
+        # tāpēc aina pārzīmē tikai veco un jauno figūras vietu
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.animation = QPropertyAnimation(self, b"pos")
+
         self.setCell(row, col)
 
-    def setCell(self, row, col):
-        # Figuras pārvietošana
+    def setCell(self, row, col, duration=0):
+        # Figuras pārvietošana; duration > 0 - animēta, ievadi nebloķē
         self.row = row
         self.col = col
 
-        self.x = int(col * self.size + 0.5 * self.size) - self.radius
-        self.y = int(row * self.size + 0.5 * self.size) - self.radius
+        target = QPointF(int(col * self.size + 0.5 * self.size) - self.radius,
+                         int(row * self.size + 0.5 * self.size) - self.radius)
+        self.animation.stop()
+        if duration > 0:
+            self.animation.setDuration(duration)
+            self.animation.setStartValue(self.pos())
+            self.animation.setEndValue(target)
+            self.animation.start()
+        else:
+            self.setPos(target)
 
     def setBrush(self, brush):
         self.brush = brush
+        self.update()
 
     def boundingRect(self):
-        return QRectF(self.x, self.y, self.w, self.h)
+        return QRectF(-0.5, -0.5, self.w + 1, self.h + 1)
 
     def paint(self, painter, option, widget):
-        painter.setRenderHint(QPainter.Antialiasing)
         painter.setBrush(self.brush)
-        painter.drawEllipse(self.x, self.y, self.w, self.h)
+        painter.drawEllipse(0, 0, self.w, self.h)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.onClick.emit(self.row, self.col)
 
-class Tree:
-    # Risinājumu koks
-
-    def __init__(self, type, move, score):
-        # Konstruktors
-        self.score = score  # Gajiena novertešana
-        self.type = type    # Figuras tips
-        self.move = move    # Gajiens (prev_pos, next_pos)  
-
-        self.children = []  # Bērnmezglu saraksts
-
-    def addChild(self, child):
-        # Mezgla pievienošana
-        self.children.append(child)
-
-
 class Board(QGraphicsView):
     # Spēles tāfele
     playerWin = pyqtSignal()
     computerWin = pyqtSignal()
+    searchFinished = pyqtSignal(object)
 
     def __init__(self):
         super().__init__()
@@ -201,18 +354,53 @@ class Board(QGraphicsView):
         # Izveidojam grafikas ainu
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
+        self.setRenderHint(QPainter.Antialiasing)
 
-        size = 60
+        self.MAX_DEPTH = MAX_DEPTH
+        self.TIME_LIMIT = TIME_LIMIT
+        self.search = None            # Aktīvais meklēšanas pavediens
+        self.ponder = None            # Domāšana spēlētāja gājiena laikā
+        self.analysis = False         # Padomu režīms: analīze domāšanas vietā
+        self.hints = {}               # Analīzes rezultāti {gājiens: novērtējums}
+        self.search_id = 0            # Novecojušu rezultātu atpazīšanai
+        self.trace = None             # Meklēšanas statistikas žurnāls
+        self.record_path = None       # Spēļu ierakstu fails
+
+        # Dzinēja transpozīciju tabula saglabājas starp gājieniem
+        # Ja ir izveidota galotņu tabula, dators spēlē perfekti bez meklēšanas,
+        # atklātnes grāmatas gājienus arī ņemam bez meklēšanas
+        self.engine = Engine(tablebase=Tablebase.load(), book=Book.load())
 
-        indent = 5
+        # Figuru virzieni
+        self.wolf_direction = WOLF_DIRECTION
+        self.sheep_direction = SHEEP_DIRECTION
 
-        self.MAX_DEPTH = MAX_DEPTH
+        # Dēļa izmērs un vilku skaits (engine.Geometry)
+        self.board_geometry = None
+        self.current = None
+        # Vienīgais spēles stāvoklis; figūras tikai attēlo to
+        self.game = None
+        self.finished = None          # Gājieni, pēc kuriem paziņots uzvarētājs
+        self.buildBoard(engine.DEFAULT)
 
-        self.cells = [[None] * N for _ in range(N)]
+        self.show()
+
+    def buildBoard(self, geometry):
+        # Veidojam šūnas un figūras dotajam dēļa izmēram
+        self.board_geometry = geometry
+        n = geometry.n
+        self.scene.clear()
+
+        # Lieliem dēļiem šūnas mazākas, lai dēlis ietilptu ekrānā
+        size = max(30, min(60, 600 // n))
+
+        indent = 5
+
+        self.cells = [[None] * n for _ in range(n)]
 
         # Veidojam dēļa šūnas
-        for row in range(N):
-            for col in range(N):
+        for row in range(n):
+            for col in range(n):
                 cell = Cell(row, col, size)
 
                 cell.onClick.connect(self.clicked)
@@ -226,15 +414,10 @@ class Board(QGraphicsView):
                 
                 self.scene.addItem(cell)
 
-        
-        # Figuru virzieni
-        self.wolf_direction = [(1, -1), (1, 1)]
-        self.sheep_direction = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-
         # Pievienojam vilkus
         self.wolfs = []
-        for i in range(N // 2):
-            wolf = Circle(0, 1 + 2 * i, size)
+        for row, col in geometry.wolf_start:
+            wolf = Circle(row, col, size)
             wolf.onClick.connect(self.clicked)
             wolf.setBrush(Qt.green)
             wolf.direction = self.wolf_direction
@@ -242,7 +425,8 @@ class Board(QGraphicsView):
             self.wolfs.append(wolf)
 
         # Pievienojam aitu
-        self.sheep = Circle(N - 1, 2, size)
+        self.sheep = Circle(geometry.sheep_start[0], geometry.sheep_start[1],
+                            size)
         self.sheep.onClick.connect(self.clicked)
         self.sheep.setBrush(Qt.yellow)
         self.sheep.direction = self.sheep_direction
@@ -252,383 +436,331 @@ class Board(QGraphicsView):
         self.figures = list(self.wolfs)
         self.figures.append(self.sheep)
 
+        # Figūras pēc šūnas numura
+        self.pieces = {}
+
         # Pašreizējā figura
         self.current = self.sheep
 
         # Iestatām dēļa izmērus
-        width  = N * size + 2 * indent
-        height = N * size + 2 * indent
+        self.scene.setSceneRect(0, 0, n * size, n * size)
+        width  = n * size + 2 * indent
+        height = n * size + 2 * indent
         self.setFixedSize(width, height)
-        
-        self.show()
 
-    def restart(self, player):
-        # Sākam spēli no jauna
-        if self.current:
+    def restart(self, player, geometry=None):
+        # Sākam spēli no jauna; geometry - jauns dēļa izmērs un vilku skaits
+        self.cancelSearch()
+        if self.current and self.game:
             self.highlightFigure(self.current, Qt.gray)
+        self.saveGame()
+        if geometry is not None and geometry is not self.board_geometry:
+            self.buildBoard(geometry)
 
         self.current_player = player
-
-        # Aitas sākumstāvoklis
-        self.sheep.setCell(N - 1, 2)
-
-        index = 1
-
-        # Vilku sākumstāvoklis
-        for wolf in self.wolfs:
-            wolf.setCell(0, index)
-            index += 2
+        self.engine.clear()
+        self.game = Game(self.board_geometry)
+        self.finished = None
+
+        # Figūras sākumstāvoklī
+        n = self.board_geometry.n
+        position = self.game.position
+        self.sheep.setCell(*divmod(position.sheepSquare(), n))
+        self.pieces = {position.sheepSquare(): self.sheep}
+        for wolf, sq in zip(self.wolfs, position.wolfSquares()):
+            wolf.setCell(*divmod(sq, n))
+            self.pieces[sq] = wolf
 
         self.sheep_step()
 
-    def update(self):
-        self.scene.update()
+    def saveGame(self):
+        # Pievienojam spēli ierakstu failam; tukšas spēles nesaglabājam
+        if (self.record_path is None or self.game is None
+                or not self.game.moves):
+            return
+        comment = (f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S} "
+                   f"player {self.current_player}")
+        try:
+            appendRecord(Record.fromGame(self.game), self.record_path, comment)
+        except OSError as e:
+            print(f"cannot save game: {e}", file=sys.stderr)
+
+    def moveFigure(self, move):
+        # Pārvietojam figūru no move[0] uz move[1]
+        figure = self.pieces.pop(move[0])
+        self.pieces[move[1]] = figure
+        figure.setCell(*divmod(move[1], self.board_geometry.n), ANIMATION_MS)
+        return figure
+
+    def makeMove(self, move):
+        # Gājiens spēles stāvoklī un uz dēļa
+        self.game.doMove(move)
+        self.moveFigure(move)
+
+    def nextStep(self):
+        # Nododam gājienu tam, kura kārta spēles stāvoklī
+        if self.game.side == "sheep":
+            self.sheep_step()
+        else:
+            self.wolfs_step()
 
-    def initMap(self):
-        # Inicializējam karti
-        self.map = [["E"] * N for _ in range(N)]
-        self.map[self.sheep.row][self.sheep.col] = "S"
-        for wolf in self.wolfs:
-            self.map[wolf.row][wolf.col] = "W"
+    @pyqtSlot()
+    def undo(self):
+        # Atceļam spēlētāja pēdējo gājienu un datora atbildi uz to
+        if not self.game.moves:
+            return
+        self.cancelSearch()
+        self.highlightFigure(self.current, Qt.gray)
+        while True:
+            move = self.game.undo()
+            self.moveFigure(move[::-1])
+            if self.game.side == self.current_player or not self.game.moves:
+                break
+        self.nextStep()
 
-    def canMove(self, move):
-        # Pārbaudām, vai var veikt gājienu
-        if self.isOutOfBorder(move[0], move[1]):
-            return False
+    @pyqtSlot()
+    def redo(self):
+        # Atkārtojam atceltos gājienus līdz nākamajam spēlētāja gājienam
+        if not self.game.undone:
+            return
+        self.cancelSearch()
+        self.highlightFigure(self.current, Qt.gray)
+        while True:
+            self.moveFigure(self.game.redo())
+            if self.game.side == self.current_player or not self.game.undone:
+                break
+        self.nextStep()
+
+    def limits(self):
+        # Meklēšanas ierobežojumi pēc dēļa iestatījumiem
+        return Limits(self.MAX_DEPTH if self.TIME_LIMIT is None else None,
+                      self.TIME_LIMIT)
+
+    def computerStep(self, type):
+        # Dators sāk meklēt gājienu atsevišķā pavedienā
+        # Gājienu veiksim, kad pienāks signāls moveFound
+        self.stopPonder()
+        self.search_id += 1
+
+        result = self.engine.pondered(self.game.position, type)
+        if result is not None and result[0] is not None:
+            # Gājiens jau atrasts spēlētāja gājiena laikā
+            move, score, stats = result
+            QTimer.singleShot(0, lambda search_id=self.search_id:
+                self.moveFound(search_id, type, move[0], move[1],
+                               score, stats))
+            return
 
-        if self.map[move[0]][move[1]] == "E":
-            return True
+        self.search = SearchThread(self.engine, self.search_id,
+            self.game.position.copy(), type, self.limits())
+        self.search.moveFound.connect(self.moveFound)
+        self.search.start()
+
+    def startPonder(self):
+        # Spēlētāja gājiena laikā meklējam atbildes uz visiem viņa gājieniem
+        # Padomu režīmā tā vietā analizējam pašus spēlētāja gājienus;
+        # dzinējs ir viens, tāpēc abi reizē nedarbojas
+        self.stopPonder()
+        if self.analysis:
+            self.engine.ponder_results = {}
+            self.ponder = AnalysisThread(self.engine, self.search_id,
+                self.game.position.copy(), self.current_player)
+            self.ponder.moveScored.connect(self.moveScored)
         else:
-            return False
-
-    def doMove(self, prev_pos, next_pos):
-        # Veicam gājienu
-        if self.canMove(next_pos):
-            figure = self.map[prev_pos[0]][prev_pos[1]]
-            self.map[prev_pos[0]][prev_pos[1]] = "E"
-            self.map[next_pos[0]][next_pos[1]] = figure
-
-    def heuristic(self, sheep):
-        # Heiristiskā funkcija izvērtē, cik gājienu laikā aita var sasniegt uzvaru
-        # ar nosacījumu, ka vilki ir nekustīgi
-        # Jo mazāk jo labāk
-        # O(n) sarežģītība
-        if self.sheep.row == 0:
-            # Aita augšējā rindā
-            # Mērķis sasniegts
-            return 0
-
-        self.map[sheep[0]][sheep[1]] = 0 # Inicializējam aitas 
-                                         # sākumstāvokli
-
-        # Izmantojam rindu un meklēšanu platumā
-        q = queue.Queue() # Izveidojam tukšu rindu
-        q.put(sheep)      # Pievienojam rindai sākuma pozīciju
-
-        while not q.empty():  # Meklēt, kamēr rindā ir elementi
-            current = q.get() # Izņemam elemetu no rindas sākuma 
-
-            for direction in self.sheep_direction:
-                # Izvētīsim visus iespējamos gājienus no pašreizējās pozīcijas
-                move = (current[0] + direction[0], 
-                        current[1] + direction[1])
-                if self.isOutOfBorder(move[0], move[1]):
-                    # Pārbaudām, vai figūra ir ārpus dēļa
-                    continue
-                if self.map[move[0]][move[1]] == "E":
-                    # Ja lauks ir brīvs, aizpildām to ar vērtību
-                    # kas ir vienāda ar ceļa garumu
-                    self.map[move[0]][move[1]] = (
-                        self.map[current[0]][current[1]] + 1)
-                    q.put(move) # Rindai pievienojam jaunu pozīciju
-
-        # Atrodam minimālo ceļu līdz augšējai rindai
-        min_value = float("inf")
-        for i in range(N // 2):
-            # Parbaudam vērtības augšējā rindā
-            if ((not self.map[0][2 * i + 1] in ["E", "S", "W"]) and
-                    self.map[0][2 * i + 1] < min_value):
-                # Apskatām tikai skaitliskās vērtības
-                # un atrodam minimālo
-                min_value = self.map[0][2 * i + 1]
-
-        self.map[sheep[0]][sheep[1]] = "S" # Nometam vērtību
-                                           # šunā ar aitu
-
-        # Atiestatām kartes statusu
-        for row in range(N):
-            for col in range(N):
-                if not self.map[row][col] in ["E", "S", "W"]:
-                    # Ja šūnā ir skaitlis, mēs to atzīmējam,
-                    # kā E(empty)
-
-                    self.map[row][col] = "E"
-
-        return min_value
-
-    def min_max(self, tree, type, depth, alpha, beta):
-        # Minimaksa algoritms ar alfa beta nogriešanu
-        # Izvēlas datoram maksimāli izdevīgu gājienu
-        # vilkiem - maksimālais vērtējums, aitai - minimālais
-        if depth == 0:
-            # Ja tas ir algoritma sākuma izsauksāna,
-            # inicializējam karti
-            self.initMap()
-
-        # Inicializējam sākotnējās vērtības
-        sheep = None  # Aitas pozīcija
-        wolfs = []    # Vilku pozīciju saraksts
-        best_move = None  # Labākais gājiens
-
-        # Atrodam aitas un vilku sākumstāvokli 
-        for row in range(N):
-            for col in range(N):
-                if self.map[row][col] == "S":
-                    sheep = (row, col)
-                elif self.map[row][col] == "W":
-                    wolfs.append((row, col))
-
-        if depth > self.MAX_DEPTH:
-            # Sasniegts maksimālais meklēšanas dziļums
-            # Izmantojam heiristiku un izejam no rekursijas
-            score = self.heuristic(sheep)
-            tree.score = score
-            return tree
-
+            self.ponder = PonderThread(self.engine, self.game.position.copy(),
+                self.current_player, self.limits())
+        self.ponder.start()
+
+    @pyqtSlot(bool)
+    def setAnalysis(self, enabled):
+        # Ieslēdzam vai izslēdzam padomus; spēlētāja gājiena laikā
+        # analīze sākas uzreiz
+        self.analysis = enabled
+        if self.game is None or self.current_step != self.current_player:
+            return
+        if self.game.winner() is not None:
+            return
+        self.startPonder()
+        self.showHints(self.current)
+
+    @pyqtSlot(int, int, int, int, int)
+    def moveScored(self, analysis_id, depth, prev_sq, next_sq, score):
+        # Analīzes rezultāts: atjaunojam novērtējumus uz dēļa
+        if analysis_id != self.search_id:
+            # Rezultāts no iepriekšējā gājiena analīzes
+            return
+        self.hints[(prev_sq, next_sq)] = SIGN[self.current_player] * score
+        self.showHints(self.current)
+
+    def hintText(self, value):
+        # Novērtējums no spēlētāja viedokļa; izšķirtai spēlei
+        # uzvara (+) vai zaudējums (-) pēc pusgājieniem
+        if abs(value) > INF:
+            plies = WIN - abs(value)
+            return f"+#{plies}" if value > 0 else f"-#{plies}"
+        return f"{value:+d}"
+
+    def showHints(self, figure):
+        # Figūras izgaismotajām šūnām rādām analīzes novērtējumus
+        if not figure or self.current_step != self.current_player:
+            return
+        n = self.board_geometry.n
+        best = max(self.hints.values(), default=None)
+        sq = engine.square(figure.row, figure.col, n)
+        for row, col in self.getPossibleMoves(figure):
+            value = self.hints.get((sq, engine.square(row, col, n)))
+            if value is None or not self.analysis:
+                self.cells[row][col].setHint(None)
+            else:
+                self.cells[row][col].setHint(self.hintText(value),
+                                             value == best)
+
+    def stopPonder(self):
+        # Apturam domāšanu; atrastie rezultāti saglabājas
+        if self.ponder is not None:
+            self.engine.stop()
+            self.ponder.wait()
+            self.ponder = None
+        self.engine.stopped = False
+        self.hints = {} # Padomi attiecās uz apturēto analīzi
+
+    def cancelSearch(self):
+        # Kooperatīvi apturam meklēšanu un gaidām pavediena beigas
+        if self.search is not None:
+            self.engine.stop()
+            self.search.wait()
+            self.search = None
+        self.stopPonder()
+        self.engine.ponder_results = {}
+        self.search_id += 1 # Jau nosūtītos rezultātus ignorēsim
+
+    @pyqtSlot(int, str, int, int, object, object)
+    def moveFound(self, search_id, type, prev_sq, next_sq, score, stats):
+        # Dators veic atrasto gājienu
+        if search_id != self.search_id:
+            # Rezultāts no atceltas meklēšanas
+            return
+        if self.search is not None:
+            self.search.wait()
+            self.search = None
+        self.searchFinished.emit(stats)
+        if self.trace is not None:
+            self.trace.write(type, (prev_sq, next_sq), score, stats)
         if type == "sheep":
-            # Aitas gajiens
-            best_score = float("inf") # Labākā novērtējuma sākuma vērtība
-            for direction in self.sheep_direction:
-                # Pārbaudām visus iespējamos gājienu variantus
-                current_pos = sheep # Pašreizējā pozīcija
-                # Atrodam nākamo gājienu
-                next_pos = (current_pos[0] + direction[0],
-                            current_pos[1] + direction[1])
-                if self.canMove(next_pos): # Ja gajiens ir iespējama
-                    # Veicam gājienu
-                    self.doMove(current_pos, next_pos)
-                    move = (current_pos, next_pos)
-                    # Izveidojam risinājuma koka bērnmezglu
-                    child = Tree("wolf", move, 0)
-                    # Veicam rekursīvu izsaukšanu
-                    self.min_max(child, "wolf", 
-                        depth + 1, alpha, beta)
-                    result = child.score
-                    # Kokam pievienojam bērnmēzglu
-                    tree.addChild(child)
-                    # Atcelt gajienu
-                    self.doMove(next_pos, current_pos)
-
-                    if not best_move or result < best_score:
-                        # Meklējam labāko gājienu
-                        best_move = (current_pos, next_pos)
-                        best_score = result
-
-                    # Mainām beta nozīmi
-                    beta = min(beta, result)
-                    
-                    # Alfa-beta nogriešana
-                    if beta <= alpha:
-                        break
+            # Staigā aita
+            self.highlightFigure(self.current, Qt.gray)
+            # Veicam gājienu
+            self.makeMove((prev_sq, next_sq))
+            # Nododam gājienu spēlētājam
+            self.wolfs_step()
         else:
-            # Vilku gajiens
-            best_score = float("-inf") # Labākā novērtējuma sākuma vērtība
-            for wolf in wolfs:
-                # Visiem vilkiem
-                for direction in self.wolf_direction:
-                    # Pārbaudām visus gājienu variantus
-                    current_pos = wolf # Pašreizējā pozīcija
-
-                    # Atrodam nākamo gājienu
-                    next_pos = (current_pos[0] + direction[0],
-                                current_pos[1] + direction[1])
-                    if self.canMove(next_pos): # Ja gaita ir iespējama
-                        # Veicam gājienu
-                        self.doMove(current_pos, next_pos)
-                        move = (current_pos, next_pos)
-                        # Izveidojam risinājuma koka bērnmezglu
-                        child = Tree("sheep", move, 0)
-                        # Veicam rekursīvu izaicinājumu
-                        self.min_max(child, "sheep", 
-                                depth + 1, alpha, beta)
-                        result = child.score
-                        # Kokam pievienojam bērnelementu
-                        tree.addChild(child)
-                        # Atcelt gajienu
-                        self.doMove(next_pos, current_pos)
-
-                        if not best_move or result > best_score:
-                            # Meklējam labāko gājienu
-                            best_move = (current_pos, next_pos)
-                            best_score = result
-                        
-                        # Koriģējam Alfas vērtību 
-                        alpha = max(alpha, result)
-
-                        # Alfa-beta nogriešana
-                        if beta <= alpha:
-                            break
-
-        if not best_move:
-            # Nav atrasts labākais gājiens
-            # izmantojam heiristisko novērtējumu
-            score = self.heuristic(sheep)
-            tree.score = score
-            return tree
-
-        if depth == 0:
-            # Ja dziļums ir 0
-            # Dators veic gājienu
-            if type == "sheep":
-                # Staigā aita
-                (prev_pos, next_pos) = best_move
-                self.highlightFigure(self.current, Qt.gray)
-                # Veicam gājienu
-                self.current.setCell(next_pos[0], next_pos[1])
-                # Nododam gājienu spēlētājam
-                self.wolfs_step()
-            else:
-                # Staigā vilks
-                (prev_pos, next_pos) = best_move
-                current = None
-                for wolf in self.wolfs:
-                    # Atrodam vilku, kas staigās
-                    if (wolf.row == prev_pos[0] and 
-                        wolf.col == prev_pos[1]):
-                        current = wolf
-                        break
-                # Veicam gājienu
-                current.setCell(next_pos[0], next_pos[1])
-                # Nododam gājienu spēlētājam
-                self.sheep_step()
-
-        tree.score = best_score # Saglabājam labāko novērtējumu
-        return tree             # Atgriežam rezultātu
+            # Staigā vilks
+            self.makeMove((prev_sq, next_sq))
+            # Nododam gājienu spēlētājam
+            self.sheep_step()
 
     def highlightCells(self, cells, color):
         for cell in cells:
             self.cells[cell[0]][cell[1]].setBrush(color)
 
-    def isOutOfBorder(self, row, col):
-        if row < 0 or row >= N or col < 0 or col >= N:
-            return True
-        return False
-
     def getPossibleMoves(self, figure):
         # Iegūstam iespējamo gājienu sarakstu
-        moves = [(figure.row + e[0], figure.col + e[1]) 
-            for e in figure.direction]
-        moves = [x for x in moves if not self.isOutOfBorder(x[0], x[1])]
-        
-        filled = [(x.row, x.col) for x in self.figures]
-
-        moves = [x for x in moves if not x in filled]
-
-        return moves
+        return engine.getPossibleMoves(self.game.position,
+                                       (figure.row, figure.col))
 
     def highlightFigure(self, figure, color):
         # Iespējamo gājienu izgaismošana
         if figure:
             moves = self.getPossibleMoves(figure)
             self.highlightCells(moves, color)
-   
-    def checkVictory(self):
-        # Uzvaras apstākļu pārbaude
-        if self.sheep.row == 0:
-            if self.current_player == "sheep":
-                self.playerWin.emit()
+            if color == Qt.darkGray:
+                self.showHints(figure)
             else:
-                self.computerWin.emit()
+                for row, col in moves:
+                    self.cells[row][col].setHint(None)
 
-            return True
-        
-        moves = self.getPossibleMoves(self.sheep)
-        if not moves:
-            if self.current_player == "wolfs":
-                self.playerWin.emit()
-            else:
-                self.computerWin.emit()
+    def checkVictory(self):
+        # Uzvaras apstākļu pārbaude
+        winner = self.game.winner()
+        if winner is None:
+            return False
 
+        # Pēc atcelšanas un atkārtošanas to pašu uzvaru neskaitām vēlreiz
+        if self.finished == self.game.moves:
             return True
+        self.finished = list(self.game.moves)
 
-        moves = []
-        for wolf in self.wolfs:
-            moves = moves + self.getPossibleMoves(wolf)
-
-        if not moves:
-            if self.current_player == "sheep":
-                self.playerWin.emit()
-            else:
-                self.computerWin.emit()
-        
-            return True
+        if winner == self.current_player:
+            self.playerWin.emit()
+        else:
+            self.computerWin.emit()
+        return True
 
-        return False
- 
     def sheep_step(self):
         # Aitas gajiens
         self.current = self.sheep
         self.current_step = "sheep"
-        self.update()
-        
+
         flag = self.checkVictory()
         if flag:
             return
        
         if self.current_player == "wolfs":
-            tree = Tree("sheep", None, 0)
-            self.min_max(tree, "sheep", 0, 
-                float("-inf"), float("inf"))
+            self.computerStep("sheep")
         else:
             self.highlightFigure(self.current, Qt.darkGray)
-            self.update()
+            self.startPonder()
   
     def wolfs_step(self):
         # Vilku gajiens
         self.current = None
         self.current_step = "wolfs"
 
-        self.update()
-        
         flag = self.checkVictory()
         if flag:
             return
         
         if self.current_player == "sheep":
-            tree = Tree("wolfs", None, 0)
-            self.min_max(tree, "wolfs", 0, 
-                float("-inf"), float("inf"))
-        self.update()
+            self.computerStep("wolfs")
+        else:
+            self.startPonder()
  
     @pyqtSlot(int, int)
     def clicked(self, row, col):
         # Klikšķa apstrāde
+        if self.current_step != self.current_player:
+            # Datora gājiens, spēlētāja klikšķus ignorējam
+            return
+        n = self.board_geometry.n
         if self.current_step == "wolfs":
-            wolfs = [(x.row, x.col) for x in self.wolfs]
-            if (row, col) in wolfs:
-                wolf = [x for x in self.wolfs 
-                    if x.row == row and x.col == col]
-                if wolf:
-                    self.highlightFigure(self.current, Qt.gray)
-                    self.current = wolf[0]
-                    self.highlightFigure(self.current, Qt.darkGray)
+            wolf = self.pieces.get(engine.square(row, col, n))
+            if wolf is not None and wolf is not self.sheep:
+                self.highlightFigure(self.current, Qt.gray)
+                self.current = wolf
+                self.highlightFigure(self.current, Qt.darkGray)
         if self.current:
             moves = self.getPossibleMoves(self.current)
             if (row, col) in moves:
                 self.highlightFigure(self.current, Qt.gray)
-                self.current.setCell(row, col)
-                
-                self.update()
-                
+                self.makeMove((
+                    engine.square(self.current.row, self.current.col, n),
+                    engine.square(row, col, n)))
+
                 if self.current_step == "wolfs":
                     self.sheep_step()
                 else:
                     self.wolfs_step()
 
-        self.update()
-
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    parser = argparse.ArgumentParser(description="Sheep and wolves")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="log search statistics per computer move "
+                             "(.csv or JSON lines)")
+    parser.add_argument("--record", metavar="FILE", default=RECORD_PATH,
+                        help="append finished and abandoned games to FILE "
+                             "(empty to disable)")
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(args.trace, args.record or None)
     window.show()
     sys.exit(app.exec_())
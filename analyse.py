@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Spēļu ierakstu analīze: katru stāvokli meklējam no jauna un
+# salīdzinām spēlēto gājienu ar labāko
+#
+# Ierakstu failu (record.py) lasām pa rindai; stāvokļus pa --chunk
+# gabaliem sadalām procesiem. Procesiem vienlaikus nodoti ne vairāk kā
+# WINDOW gabali katram procesam, tāpēc atmiņa nav atkarīga no faila garuma.
+# Rezultāti ierakstu secībā, JSON rinda katram gājienam:
+#     game, line, ply, side, move, score, best, best_score, loss,
+#     blunder, depth
+# Novērtējumi ir no vilku viedokļa kā dzinējā. loss - cik gājējs
+# zaudēja salīdzinājumā ar labāko gājienu. blunder - gājiens zaudē
+# izšķirtu uzvaru, noved pie izšķirta zaudējuma vai loss >= --blunder.
+# Kļūdainiem ierakstiem: {"game", "line", "error"}.
+#
+# Palaišana: python analyse.py games.rec [--depth 6 | --time 0.1]
+#     [--workers N] [--output analysis.jsonl]
+
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import INF, SIGN, Engine, Geometry, Limits, Position
+from record import Record, readRecords
+
+BLUNDER = 3     # Zaudējums heiristikas vienībās, kas jau ir rupja kļūda
+CHUNK = 16      # Stāvokļi vienā procesa uzdevumā
+WINDOW = 4      # Nepabeigtie uzdevumi uz katru procesu
+
+_engine = None  # Procesa dzinējs; transpozīciju tabula kopīga stāvokļiem
+_limits = None
+_blunder = BLUNDER
+
+
+def _init(depth, time_limit, blunder):
+    # Procesa inicializācija
+    global _engine, _limits, _blunder
+    _engine = Engine()
+    _limits = Limits(depth, time_limit)
+    _blunder = blunder
+
+
+def outcome(score, side):
+    # Izšķirta uzvara (1) vai zaudējums (-1) gājējam, citādi 0
+    value = SIGN[side] * score
+    if value > INF:
+        return 1
+    if value < -INF:
+        return -1
+    return 0
+
+
+def _analysePosition(job):
+    # Labākais gājiens un spēlētā gājiena novērtējums
+    # tajā pašā dziļumā
+    game, line, ply, wolfs, sheep, n, wolf_count, side, move = job
+    position = Position(wolfs, sheep, Geometry.get(n, wolf_count))
+    best, best_score, stats = _engine.search(position, side, _limits)
+    score = best_score
+    if move != best:
+        score = SIGN[side] * _engine.searchMove(
+            position, side, move, stats.depth - 1, float("-inf"))
+    loss = max(0, SIGN[side] * (best_score - score))
+    blunder = (outcome(score, side) < outcome(best_score, side) or
+               (outcome(best_score, side) == 0 and loss >= _blunder))
+    return {"game": game, "line": line, "ply": ply, "side": side,
+            "move": move, "score": score, "best": best,
+            "best_score": best_score, "loss": loss, "blunder": blunder,
+            "depth": stats.depth}
+
+
+def _analyseChunk(chunk):
+    # Kļūdu rezultāti iet cauri nemainīti, lai saglabātu secību
+    return [item if isinstance(item, dict) else _analysePosition(item)
+            for item in chunk]
+
+
+def positionJobs(lines):
+    # Ierakstu rindas -> stāvokļu uzdevumi pa vienam
+    for game, (number, line) in enumerate(lines):
+        try:
+            record = Record.parse(line)
+            geometry = record.geometry
+            for ply, position, side, move in record.positions():
+                yield (game, number, ply, position.wolfs, position.sheep,
+                       geometry.n, geometry.wolf_count, side, move)
+        except ValueError as e:
+            yield {"game": game, "line": number, "error": str(e)}
+
+
+def chunked(items, size):
+    # Virkne -> saraksti pa size elementiem
+    items = iter(items)
+    while chunk := list(itertools.islice(items, size)):
+        yield chunk
+
+
+def boundedMap(pool, function, items, window):
+    # Kā pool.map, bet virkni lasām tikai tik tālu, lai procesiem
+    # būtu ne vairāk kā window uzdevumu; rezultāti sākotnējā secībā
+    pending = collections.deque()
+    for item in items:
+        pending.append(pool.submit(function, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-search recorded games and flag blunders")
+    parser.add_argument("records", nargs="?", type=argparse.FileType("r"),
+                        default=sys.stdin, help="game record file")
+    parser.add_argument("--depth", type=int,
+                        help="search depth (default engine.MAX_DEPTH)")
+    parser.add_argument("--time", type=float,
+                        help="seconds per position instead of fixed depth")
+    parser.add_argument("--blunder", type=int, default=BLUNDER,
+                        help="score loss that counts as a blunder")
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk", type=int, default=CHUNK,
+                        help="positions per worker task")
+    parser.add_argument("--output", type=argparse.FileType("w"),
+                        default=sys.stdout)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    positions = 0
+    blunders = 0
+    errors = 0
+    chunks = chunked(positionJobs(readRecords(args.records)), args.chunk)
+    with ProcessPoolExecutor(args.workers, initializer=_init,
+                             initargs=(args.depth, args.time,
+                                       args.blunder)) as pool:
+        for results in boundedMap(pool, _analyseChunk, chunks,
+                                  args.workers * WINDOW):
+            for result in results:
+                if "error" in result:
+                    errors += 1
+                else:
+                    positions += 1
+                    blunders += result["blunder"]
+                args.output.write(json.dumps(result) + "\n")
+            args.output.flush()
+
+    elapsed = time.perf_counter() - start
+    rate = positions / elapsed if elapsed else 0.0
+    print(f"{positions:,} positions, {blunders:,} blunders, "
+          f"{errors:,} bad records in {elapsed:.1f}s "
+          f"({rate:,.0f} positions/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Heiristikas pakešu novērtējums ar NumPy (neobligāts)
+#
+# Tā pati meklēšana platumā kā engine.heuristic, tikai bitu maskas ir
+# uint64 masīvi: viens elements katram stāvoklim, visa pakete vienā
+# NumPy operāciju virknē. Dēļiem virs 64 šūnām maska neietilpst uint64,
+# tur novērtējam pa vienam ar engine.heuristic.
+#
+# Lietošana: Engine(batch=batch.evaluateBatch)
+
+import numpy as np
+
+import engine
+from engine import INF, Position
+
+_masks = {}  # Ģeometrijas maskas uint64 formā
+
+
+def geometryMasks(geometry):
+    # (free_board, top_row, not_left, not_right, nobīdes) kā np.uint64
+    masks = _masks.get(geometry)
+    if masks is None:
+        g = geometry
+        masks = _masks[geometry] = tuple(np.uint64(value) for value in (
+            g.free_board, g.top_row, g.not_left, g.not_right,
+            g.up_left, g.up_right, g.down_left, g.down_right))
+    return masks
+
+
+def evaluateBatch(sheep_squares, wolfs, geometry=engine.DEFAULT):
+    # engine.heuristic katram stāvoklim paketē
+    # sheep_squares - aitu šūnas, wolfs - vilku maskas; atgriežam int32 masīvu
+    if geometry.squares > 64:
+        return np.array([engine.heuristic(Position(mask, 1 << sq, geometry))
+                         for sq, mask in zip(sheep_squares, wolfs)],
+                        dtype=np.int32)
+
+    (free_board, top_row, not_left, not_right,
+     up_left, up_right, down_left, down_right) = geometryMasks(geometry)
+    zero = np.uint64(0)
+    frontier = np.left_shift(np.uint64(1),
+                             np.asarray(sheep_squares, dtype=np.uint64))
+    free = free_board & ~np.asarray(wolfs, dtype=np.uint64)
+    result = np.full(len(frontier), INF, dtype=np.int32)
+
+    # Aita jau augšējā rindā
+    done = (frontier & top_row) != zero
+    result[done] = 0
+    index = np.flatnonzero(~done)   # Vēl nepabeigto stāvokļu numuri
+    frontier = frontier[index]
+    free = free[index]
+    reached = frontier
+    distance = 0
+
+    while len(index):
+        distance += 1
+        left = frontier & not_left
+        right = frontier & not_right
+        frontier = ((left >> up_left) | (right >> up_right) |
+                    (left << down_left) | (right << down_right)) & free
+        frontier &= ~reached
+        # Sasniegta augšējā rinda; tukšs slānis nozīmē INF
+        top = (frontier & top_row) != zero
+        result[index[top]] = distance
+        active = ~top & (frontier != zero)
+        index = index[active]
+        frontier = frontier[active]
+        free = free[active]
+        reached = reached[active] | frontier
+
+    return result
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Dzinēja etaloni
+#
+# Palaišana:
+#     python bench.py          - heiristika, kešatmiņa, kārtošana, režīmi
+#     python bench.py micro    - gājienu ģenerēšana, heiristika, checkVictory
+#     python bench.py regress  - fiksēto stāvokļu salīdzinājums ar bāzi
+#     python bench.py regress --update - bāzes faila pārrakstīšana
+#     python bench.py size     - meklēšanas izmaksas atkarībā no dēļa izmēra
+#     python bench.py batch    - NumPy pakešu novērtējums (vajag NumPy)
+#
+# Gājieniem un novērtējumiem jāsakrīt ar bāzi precīzi. Palēnināšanos
+# mērām ar mezglu skaitu, kas nav atkarīgs no datora: kļūda, ja tas
+# pieaug vairāk par NODE_GROWTH (samazinājums ir uzlabojums). Laiki bāzes
+# failā ir konkrētajam datoram, tāpēc tos pārbaudām tikai ar --slowdown
+# pēc bāzes atjaunošanas ar --update uz sava datora.
+
+import argparse
+import json
+import os
+import queue
+import random
+import sys
+import time
+
+import engine
+from engine import N, SHEEP_DIRECTION, Geometry, Limits, Position
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "bench_baseline.json")
+NODE_GROWTH = 1.10  # Pieļaujamais mezglu skaita pieaugums stāvoklī
+REPEAT = 5          # Mēģinājumu skaits; ņemam labāko laiku
+
+# Regresijas stāvokļi: (nosaukums, aita, vilki, dziļums);
+# katrs tiek meklēts abām pusēm. Pirmie nav statiski izšķirti (aita nav
+# tikusi garām vilkiem, vilku līnija nav slēgta) un meklēšana tajos
+# nesasniedz spēles beigas, tāpēc tiek pārbaudīta heiristiskā meklēšana.
+# Pēdējie ir izšķirti (decided) vai tuvu beigām, to novērtējumi bāzē ir
+# precīzi uzvaras novērtējumi (winScore)
+POSITIONS = [
+    ("opening", (6, 1), [(0, 1), (0, 5), (0, 7), (3, 2)], 10),
+    ("opening-advance", (7, 4), [(0, 1), (0, 3), (0, 7), (3, 4)], 10),
+    ("opening-flank", (6, 5), [(0, 3), (0, 7), (1, 4), (3, 2)], 10),
+    ("midgame", (7, 0), [(0, 1), (0, 7), (1, 2), (4, 1)], 12),
+    ("midgame-center", (5, 4), [(1, 2), (1, 4), (2, 3), (4, 5)], 12),
+    ("midgame-flank", (6, 7), [(1, 0), (1, 6), (2, 5), (2, 7)], 12),
+    ("wolf-wall", (6, 1), [(1, 0), (2, 3), (3, 2), (3, 4)], 12),
+    ("wolf-behind", (5, 0), [(0, 5), (2, 1), (2, 3), (6, 5)], 12),
+    ("late-wolf", (7, 4), [(1, 4), (2, 3), (2, 7), (5, 2)], 12),
+    ("start", (7, 2), [(0, 1), (0, 3), (0, 5), (0, 7)], 12),
+    ("wolf-line", (6, 1), [(4, 1), (4, 3), (4, 5), (4, 7)], 14),
+    ("sheep-passed", (2, 3), [(3, 0), (3, 2), (4, 5), (5, 6)], 12),
+    ("breakthrough", (2, 1), [(0, 1), (1, 4), (4, 5), (6, 7)], 14),
+    ("trapped", (7, 0), [(5, 0), (4, 3), (3, 4), (2, 7)], 14),
+]
+
+
+def queueHeuristic(position):
+    # Sākotnējā heiristika salīdzināšanai: meklēšana platumā ar queue.Queue
+    # uz simbolu režģa, kuru pēc tam atiestatām
+    grid = [["E"] * N for _ in range(N)]
+    for sq in position.wolfSquares():
+        grid[sq // N][sq % N] = "W"
+    sheep = divmod(position.sheepSquare(), N)
+    if sheep[0] == 0:
+        return 0
+
+    grid[sheep[0]][sheep[1]] = 0
+    q = queue.Queue()
+    q.put(sheep)
+    while not q.empty():
+        current = q.get()
+        for direction in SHEEP_DIRECTION:
+            move = (current[0] + direction[0], current[1] + direction[1])
+            if move[0] < 0 or move[0] >= N or move[1] < 0 or move[1] >= N:
+                continue
+            if grid[move[0]][move[1]] == "E":
+                grid[move[0]][move[1]] = grid[current[0]][current[1]] + 1
+                q.put(move)
+
+    min_value = float("inf")
+    for i in range(N // 2):
+        value = grid[0][2 * i + 1]
+        if not value in ["E", "S", "W"] and value < min_value:
+            min_value = value
+
+    grid[sheep[0]][sheep[1]] = "S"
+    for row in range(N):
+        for col in range(N):
+            if not grid[row][col] in ["E", "S", "W"]:
+                grid[row][col] = "E"
+
+    return min_value
+
+
+def randomPositions(count, seed=0, geometry=engine.DEFAULT):
+    # Nejauši stāvokļi uz tumšajām šūnām
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(count):
+        squares = rng.sample(geometry.dark, geometry.wolf_count + 1)
+        wolfs = sum(1 << sq for sq in squares[1:])
+        positions.append(Position(wolfs, 1 << squares[0], geometry))
+    return positions
+
+
+def rate(function, positions, repeat=3):
+    # Labākais izsaukumu skaits sekundē no vairākiem mēģinājumiem
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for position in positions:
+            function(position)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(positions) / elapsed)
+    return best
+
+
+def benchHeuristic(count=20000):
+    # Lapu novērtējumi sekundē: sākotnējā un bitu masku heiristika
+    positions = randomPositions(count)
+    for position in positions:
+        assert engine.heuristic(position) == min(queueHeuristic(position),
+                                                 engine.INF)
+
+    before = rate(queueHeuristic, positions)
+    after = rate(engine.heuristic, positions)
+    print(f"heuristic: queue {before:,.0f}/s, "
+          f"bitboard {after:,.0f}/s ({after / before:.1f}x)")
+
+
+def benchEvalCache(formations=200):
+    # Kešatmiņas novērtējumi: katram vilku izvietojumam visas aitas šūnas
+    positions = []
+    for formation in randomPositions(formations, seed=1):
+        free = [sq for sq in range(N * N) if (sq // N + sq % N) % 2
+                and not formation.wolfs >> sq & 1]
+        positions.extend(Position(formation.wolfs, 1 << sq) for sq in free)
+
+    cache = engine.EvalCache()
+    for position in positions:
+        assert cache.evaluate(position) == engine.heuristic(position)
+
+    before = rate(engine.heuristic, positions)
+    after = rate(cache.evaluate, positions)
+    print(f"eval cache: flood fill {before:,.0f}/s, "
+          f"cached {after:,.0f}/s ({after / before:.1f}x)")
+
+    # Kešatmiņas statistika reālā meklēšanā
+    searcher = engine.Engine()
+    for position in randomPositions(8, seed=2):
+        searcher.search(position, "sheep", engine.Limits(10))
+    cache = searcher.eval_cache
+    print(f"eval cache in search: hit rate {cache.hitRate():.1%}, "
+          f"{len(cache.maps)} maps, {cache.memory() / 1024:.0f} KiB")
+
+
+def benchOrdering(depth=10, count=12):
+    # Apmeklēto mezglu skaits fiksētā dziļumā ar katru kārtošanas politiku
+    positions = randomPositions(count, seed=3)
+    policies = [(), ("tt",), ("killers",), ("history",), ("static",),
+                tuple(sorted(engine.ORDERING)),
+                ("history", "killers", "static", "tt")]
+    for ordering in policies:
+        nodes = 0
+        start = time.perf_counter()
+        for position in positions:
+            for side in ("sheep", "wolfs"):
+                searcher = engine.Engine(ordering=ordering)
+                limits = engine.Limits(depth, time=float("inf"))
+                nodes += searcher.search(position, side, limits)[2].nodes
+        elapsed = time.perf_counter() - start
+        name = "+".join(ordering) or "none"
+        print(f"ordering {name}: {nodes:,} nodes, {elapsed:.2f}s")
+
+
+def benchModes(depth=12, count=12):
+    # Apmeklēto mezglu skaits ar katru meklēšanas režīmu
+    positions = randomPositions(count, seed=3)
+    for mode in engine.SEARCH_MODES:
+        for aspiration in ((0, engine.ASPIRATION) if mode != "mtdf" else (0,)):
+            nodes = 0
+            start = time.perf_counter()
+            for position in positions:
+                for side in ("sheep", "wolfs"):
+                    searcher = engine.Engine(mode=mode, aspiration=aspiration)
+                    limits = engine.Limits(depth, time=float("inf"))
+                    nodes += searcher.search(position, side, limits)[2].nodes
+            elapsed = time.perf_counter() - start
+            name = mode + (f" aspiration {aspiration}" if aspiration else "")
+            print(f"mode {name}: {nodes:,} nodes, {elapsed:.2f}s")
+
+
+def benchMicro(count=20000):
+    # Atsevišķo operāciju izsaukumi sekundē karsto vietu meklēšanai
+    positions = randomPositions(count, seed=4)
+    moves = {position: position.getMoves("wolfs") for position in positions}
+
+    def doUndo(position):
+        for move in moves[position]:
+            position.doMove(move)
+            position.undoMove(move)
+
+    benchmarks = [
+        ("getMoves sheep", lambda position: position.getMoves("sheep")),
+        ("getMoves wolfs", lambda position: position.getMoves("wolfs")),
+        ("doMove/undoMove", doUndo),
+        ("heuristic", engine.heuristic),
+        ("checkVictory", engine.checkVictory),
+        ("key", lambda position: position.key("sheep")),
+    ]
+    for name, function in benchmarks:
+        print(f"{name}: {rate(function, positions):,.0f}/s")
+
+
+def benchBoardSize(depth=10, sizes=(6, 8, 10, 12, 14, 16), count=6):
+    # Meklēšanas izmaksas fiksētā dziļumā atkarībā no dēļa izmēra
+    # (N // 2 vilki); sākuma stāvoklis un nejauši stāvokļi
+    for n in sizes:
+        geometry = Geometry.get(n)
+        positions = [geometry.startPosition()]
+        positions += [position for position in
+                      randomPositions(count * 2, seed=5, geometry=geometry)
+                      if engine.checkVictory(position) is None][:count]
+        nodes = 0
+        start = time.perf_counter()
+        for position in positions:
+            for side in ("sheep", "wolfs"):
+                searcher = engine.Engine()
+                nodes += searcher.search(position, side,
+                                         Limits(depth))[2].nodes
+        elapsed = time.perf_counter() - start
+        heuristic = rate(engine.heuristic, positions * 100)
+        print(f"{n}x{n}, {geometry.wolf_count} wolves: {nodes:,} nodes, "
+              f"{elapsed:.2f}s, {nodes / elapsed:,.0f} nodes/s, "
+              f"heuristic {heuristic:,.0f}/s")
+
+
+def benchBatch(count=4096, sizes=tuple(1 << k for k in range(13)),
+               depth=10):
+    # batch.evaluateBatch: novērtējumi sekundē pēc paketes izmēra pret
+    # engine.heuristic un regresijas stāvokļu meklēšana ar un bez paketēm
+    try:
+        import batch
+    except ImportError:
+        print("batch: NumPy is not installed")
+        return
+    positions = randomPositions(count, seed=6)
+    sheep_squares = [position.sheepSquare() for position in positions]
+    wolfs = [position.wolfs for position in positions]
+    scalar = rate(engine.heuristic, positions)
+    print(f"heuristic: {scalar:,.0f}/s")
+    for size in sizes:
+        best = 0.0
+        for _ in range(3):
+            start = time.perf_counter()
+            for offset in range(0, count, size):
+                batch.evaluateBatch(sheep_squares[offset:offset + size],
+                                    wolfs[offset:offset + size])
+            best = max(best, count / (time.perf_counter() - start))
+        print(f"batch {size}: {best:,.0f}/s ({best / scalar:.2f}x)")
+
+    for name, options in (("scalar", {}),
+                          ("batch", {"batch": batch.evaluateBatch})):
+        nodes = 0
+        evals = 0
+        start = time.perf_counter()
+        for _, sheep, wolf_cells, _ in POSITIONS:
+            position = Position.fromCells(sheep, wolf_cells)
+            for side in ("sheep", "wolfs"):
+                stats = engine.Engine(**options).search(
+                    position.copy(), side, Limits(depth))[2]
+                nodes += stats.nodes
+                evals += stats.evals
+        elapsed = time.perf_counter() - start
+        print(f"search {name}: {nodes:,} nodes, {evals:,} evals, "
+              f"{elapsed:.2f}s")
+
+
+def runRegression(repeat=REPEAT):
+    # Katram stāvoklim un pusei: gājiens, novērtējums, mezgli un labākais
+    # laiks no vairākiem mēģinājumiem ar tukšu dzinēju
+    results = {}
+    for name, sheep, wolfs, depth in POSITIONS:
+        for side in ("sheep", "wolfs"):
+            best = None
+            for _ in range(repeat):
+                position = Position.fromCells(sheep, wolfs)
+                start = time.perf_counter()
+                move, score, stats = engine.Engine().search(
+                    position, side, Limits(depth))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[f"{name}/{side}"] = {
+                "depth": depth, "move": list(move), "score": score,
+                "nodes": stats.nodes, "time": best}
+    return results
+
+
+def compareRegression(results, baseline, growth=NODE_GROWTH, slowdown=None):
+    # Salīdzinām ar bāzi; atgriežam kļūdu sarakstu
+    # slowdown - pieļaujamā kopējā laika attiecība pret bāzi vai None
+    failures = []
+    total = base_total = 0.0
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key}: not in baseline")
+            continue
+        ratio = result["time"] / base["time"] if base["time"] else 1.0
+        total += result["time"]
+        base_total += base["time"]
+        print(f"{key}: move {tuple(result['move'])}, score {result['score']}, "
+              f"{result['nodes']:,} nodes ({result['nodes'] - base['nodes']:+,}),"
+              f" {result['time'] * 1000:.1f} ms ({ratio:.2f}x)")
+        if result["depth"] != base["depth"]:
+            failures.append(f"{key}: depth {base['depth']} -> "
+                            f"{result['depth']}, update the baseline")
+            continue
+        if result["move"] != base["move"] or result["score"] != base["score"]:
+            failures.append(f"{key}: move {tuple(base['move'])} score "
+                            f"{base['score']} -> move {tuple(result['move'])} "
+                            f"score {result['score']}")
+        if result["nodes"] > base["nodes"] * growth:
+            failures.append(f"{key}: {base['nodes']:,} -> "
+                            f"{result['nodes']:,} nodes "
+                            f"({result['nodes'] / base['nodes']:.2f}x)")
+    if base_total:
+        print(f"total: {total:.2f}s ({total / base_total:.2f}x baseline)")
+        if slowdown is not None and total / base_total > slowdown:
+            failures.append(f"total: {total / base_total:.2f}x slower")
+    return failures
+
+
+def benchRegression(path=BASELINE_PATH, update=False, repeat=REPEAT,
+                    growth=NODE_GROWTH, slowdown=None):
+    # Regresijas etalons; 0 - viss kārtībā, 1 - ir regresijas
+    results = runRegression(repeat)
+    if update or not os.path.exists(path):
+        with open(path, "w") as f:
+            # Viens ieraksts rindā, lai izmaiņas būtu viegli salīdzināt
+            f.write("{\n" + ",\n".join(
+                f" {json.dumps(key)}: {json.dumps(result, sort_keys=True)}"
+                for key, result in results.items()) + "\n}\n")
+        print(f"baseline written to {path}")
+        return 0
+
+    with open(path) as f:
+        baseline = json.load(f)
+    failures = compareRegression(results, baseline, growth, slowdown)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Engine benchmarks")
+    parser.add_argument("suite", nargs="?", default="all",
+                        choices=["all", "micro", "regress", "size",
+                                 "batch"])
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true",
+                        help="rewrite the regression baseline")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--growth", type=float, default=NODE_GROWTH,
+                        help="allowed node count ratio per position")
+    parser.add_argument("--slowdown", type=float,
+                        help="allowed total time ratio against a baseline "
+                             "written on this machine")
+    args = parser.parse_args()
+
+    if args.suite == "micro":
+        benchMicro()
+    elif args.suite == "size":
+        benchBoardSize()
+    elif args.suite == "batch":
+        benchBatch()
+    elif args.suite == "regress":
+        sys.exit(benchRegression(args.baseline, args.update, args.repeat,
+                                 args.growth, args.slowdown))
+    else:
+        benchHeuristic()
+        benchEvalCache()
+        benchOrdering()
+        benchModes()
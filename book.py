@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Atklātnes grāmata: labākie gājieni pirmajos pusgājienos no sākuma
+#
+# Visus stāvokļus, kas sasniedzami --plies pusgājienos no sākuma
+# izvietojuma, abām pusēm meklējam --depth dziļumā. Spēlē dzinējs
+# gājienu ņem no grāmatas bez meklēšanas (Engine(book=...)).
+#
+# Faila formāts: galvene (HEADER) un ieraksti (ENTRY), sakārtoti pēc
+# stāvokļa atslēgas (Position.key), lai tos varētu meklēt bināri:
+#     atslēga, gājiens (no, uz), novērtējums (vilku viedoklis), dziļums
+#
+# Palaišana: python book.py [fails] [--plies 10] [--depth 18]
+
+import argparse
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+from engine import Engine, Geometry, Limits, Position
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")
+BOOK_PLIES = 10    # Cik pusgājienus no sākuma aptver grāmata
+BOOK_DEPTH = 18    # Meklēšanas dziļums katram stāvoklim
+
+HEADER = struct.Struct("<4sBBBxI")  # Paraksts, versija, N, vilki, ieraksti
+ENTRY = struct.Struct("<QBBhB")     # Atslēga, no, uz, novērtējums, dziļums
+MAGIC = b"SWOB"
+VERSION = 1
+
+_engine = None  # Procesa dzinējs grāmatas veidošanai
+
+
+def openingPositions(geometry, plies):
+    # Visi stāvokļi pirmajos plies pusgājienos: {atslēga: (stāvoklis, kārta)}
+    # Beigušās spēles neiekļaujam
+    frontier = {}
+    start = geometry.startPosition()
+    frontier[start.key("sheep")] = (start, "sheep")
+    positions = {}
+    for _ in range(plies):
+        following = {}
+        for key, (position, side) in frontier.items():
+            if engine.checkVictory(position) is not None:
+                continue
+            positions[key] = (position, side)
+            other = engine.OPPONENT[side]
+            for move in position.getMoves(side):
+                child = position.copy()
+                child.doMove(move)
+                following[child.key(other)] = (child, other)
+        frontier = following
+    return positions
+
+
+def _searchEntry(args):
+    # Viena stāvokļa meklēšana procesā
+    global _engine
+    key, wolfs, sheep, n, wolf_count, side, depth = args
+    if _engine is None:
+        _engine = Engine()
+    position = Position(wolfs, sheep, Geometry.get(n, wolf_count))
+    move, score, stats = _engine.search(position, side, Limits(depth))
+    return key, move, score, stats.depth
+
+
+def build(path=BOOK_PATH, plies=BOOK_PLIES, depth=BOOK_DEPTH,
+          geometry=engine.DEFAULT, workers=None, verbose=True):
+    # Meklējam visus atklātnes stāvokļus un ierakstām failā
+    start = time.perf_counter()
+    positions = openingPositions(geometry, plies)
+    jobs = [(key, position.wolfs, position.sheep, geometry.n,
+             geometry.wolf_count, side, depth)
+            for key, (position, side) in positions.items()]
+
+    entries = []
+    with ProcessPoolExecutor(workers) as pool:
+        for done, (key, move, score, reached) in enumerate(
+                pool.map(_searchEntry, jobs, chunksize=8), 1):
+            if move is not None:
+                entries.append((key, move[0], move[1], score,
+                                min(reached, 255)))
+            if verbose and not done % 100:
+                print(f"{done}/{len(jobs)} positions, "
+                      f"{time.perf_counter() - start:.0f}s", flush=True)
+    entries.sort()
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, geometry.n, geometry.wolf_count,
+                            len(entries)))
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+
+    if verbose:
+        print(f"{len(entries):,} positions written to {path} "
+              f"in {time.perf_counter() - start:.1f}s")
+
+
+class Book:
+    # Atklātnes grāmatas nolasīšana caur mmap; binārā meklēšana pēc atslēgas
+
+    def __init__(self, path=BOOK_PATH):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n, self.wolf_count, self.count = (
+            HEADER.unpack_from(self.map))
+        if ((magic, version) != (MAGIC, VERSION)
+                or len(self.map) != HEADER.size + self.count * ENTRY.size):
+            self.close()
+            raise ValueError(f"{path}: not an opening book")
+
+    @classmethod
+    def load(cls, path=BOOK_PATH):
+        # Atveram grāmatu, ja tā ir izveidota, citādi None
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def covers(self, position):
+        # Grāmata ir veidota vienam dēļa izmēram un vilku skaitam
+        geometry = position.geometry
+        return (geometry.n, geometry.wolf_count) == (self.n, self.wolf_count)
+
+    def probe(self, position, side):
+        # Atgriežam (gājiens, novērtējums, dziļums) vai None
+        if not self.covers(position):
+            return None
+        key = position.key(side)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * ENTRY.size
+            if ENTRY.unpack_from(self.map, offset)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        entry_key, prev_sq, next_sq, score, depth = ENTRY.unpack_from(
+            self.map, HEADER.size + low * ENTRY.size)
+        move = (prev_sq, next_sq)
+        # Atslēgu sakritības gadījumā gājiens var nebūt atļauts
+        if entry_key != key or move not in position.getMoves(side):
+            return None
+        return move, score, depth
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Search the opening and write the book file")
+    parser.add_argument("path", nargs="?", default=BOOK_PATH)
+    parser.add_argument("--plies", type=int, default=BOOK_PLIES)
+    parser.add_argument("--depth", type=int, default=BOOK_DEPTH)
+    parser.add_argument("--size", type=int, default=engine.N)
+    parser.add_argument("--wolves", type=int)
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+    build(args.path, args.plies, args.depth,
+          Geometry.get(args.size, args.wolves), args.workers)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Dzinēja servera klients (sk. server.py)
+#
+# Interaktīvi: python client.py --port 7878
+#     komandas no stdin tiek nosūtītas serverim, atbildes izvadītas
+# Slodzes tests: python client.py --port 7878 load --sessions 300
+#     katra sesija pēc kārtas pieprasa --searches meklēšanas nejaušos
+#     stāvokļos; beigās - meklēšanas sekundē un latentuma procentiles.
+#     Ar --spawn serveris tiek palaists uz laiku testa laikā.
+# Protokola pārbaude: python client.py --port 7878 check [--spawn]
+#     atbildes uz zināmām komandām; izejas kods 1, ja kāda neatbilst.
+
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+
+import engine
+from engine import Geometry
+
+CONNECT_TIMEOUT = 30.0  # Cik ilgi gaidām, kamēr palaistais serveris klausās
+CHECK_POSITION = "position size 12 wolves 4 startpos" # Neizšķirts stāvoklis
+CHECK_DEPTHS = (1, 2, 3, 5)
+
+
+async def connect(host, port, timeout=0.0):
+    # Savienojums ar atkārtojumiem, kamēr serveris vēl startē
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await asyncio.open_connection(host, port)
+        except OSError:
+            if time.perf_counter() >= deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def interactive(host, port):
+    # stdin rindas serverim, servera rindas stdout
+    reader, writer = await connect(host, port)
+    loop = asyncio.get_running_loop()
+
+    async def output():
+        while line := await reader.readline():
+            print(line.decode(), end="", flush=True)
+
+    printer = asyncio.create_task(output())
+    while line := await loop.run_in_executor(None, sys.stdin.readline):
+        writer.write(line.encode())
+        await writer.drain()
+    writer.write(b"quit\n")
+    await writer.drain()
+    await printer
+    writer.close()
+
+
+def randomPosition(rng, geometry, plies):
+    # position komanda pēc nejaušiem pusgājieniem no sākuma
+    position = geometry.startPosition()
+    side = "sheep"
+    moves = []
+    for _ in range(plies):
+        choices = position.getMoves(side)
+        if not choices or engine.checkVictory(position) is not None:
+            break
+        move = rng.choice(choices)
+        position.doMove(move)
+        moves.append(f"{move[0]}-{move[1]}")
+        side = engine.OPPONENT[side]
+    command = (f"position size {geometry.n} wolves {geometry.wolf_count} "
+               f"startpos")
+    if moves:
+        command += " moves " + " ".join(moves)
+    return command
+
+
+async def loadSession(host, port, index, args, latencies, errors):
+    # Viena sesija: meklēšanas pēc kārtas, mērām laiku līdz bestmove
+    rng = random.Random(args.seed * 1000003 + index)
+    geometry = Geometry.get(args.size, args.wolves)
+    reader, writer = await connect(host, port, CONNECT_TIMEOUT)
+    go = "go"
+    if args.depth is not None:
+        go += f" depth {args.depth}"
+    if args.movetime is not None:
+        go += f" movetime {args.movetime}"
+    try:
+        for _ in range(args.searches):
+            position = randomPosition(rng, geometry,
+                                      rng.randrange(args.random_plies + 1))
+            start = time.perf_counter()
+            writer.write(f"{position}\n{go}\n".encode())
+            await writer.drain()
+            while True:
+                line = (await reader.readline()).decode()
+                if not line:
+                    raise ConnectionError("server closed the connection")
+                if line.startswith("error"):
+                    errors.append(line.strip())
+                if line.startswith("bestmove"):
+                    break
+            latencies.append(time.perf_counter() - start)
+        writer.write(b"quit\n")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    # Procentile no sakārtota saraksta (tuvākā rangā)
+    index = min(len(values) - 1, max(0, int(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+
+async def load(host, port, args):
+    # Slodzes tests ar args.sessions vienlaicīgām sesijām
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(loadSession(host, port, index, args, latencies, errors)
+          for index in range(args.sessions)),
+        return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failed = [result for result in results if isinstance(result, Exception)]
+
+    latencies.sort()
+    print(f"{args.sessions} sessions, {len(latencies)} searches "
+          f"in {elapsed:.1f}s: {len(latencies) / elapsed:.1f} searches/s")
+    if latencies:
+        print("latency ms: " + ", ".join(
+            f"p{int(fraction * 100)} {percentile(latencies, fraction) * 1000:.0f}"
+            for fraction in (0.5, 0.9, 0.99))
+            + f", max {latencies[-1] * 1000:.0f}")
+    if errors or failed:
+        print(f"{len(errors)} protocol errors, {len(failed)} failed sessions"
+              + (f" (first: {failed[0]!r})" if failed else ""))
+
+
+async def check(host, port):
+    # Protokola pārbaude; atgriežam neatbilstošo atbilžu skaitu
+    reader, writer = await connect(host, port, CONNECT_TIMEOUT)
+    failures = 0
+
+    async def answer(commands):
+        # Nosūtām komandas, atbildes rindas līdz bestmove vai error
+        writer.write(f"{commands}\n".encode())
+        await writer.drain()
+        lines = []
+        while True:
+            line = (await reader.readline()).decode()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            lines.append(line.strip())
+            if line.startswith(("bestmove", "error")):
+                return lines
+
+    def expect(name, ok, lines):
+        nonlocal failures
+        print(("ok   " if ok else "FAIL ") + name
+              + ("" if ok else f": {lines}"))
+        failures += not ok
+
+    try:
+        for depth in CHECK_DEPTHS:
+            # info rindā jābūt tieši pieprasītajam dziļumam
+            lines = await answer(f"{CHECK_POSITION}\ngo depth {depth}")
+            expect(f"go depth {depth} reports depth {depth}",
+                   lines[0].startswith(f"info depth {depth} ")
+                   and lines[-1].startswith("bestmove"), lines)
+        lines = await answer("go depth 0")
+        expect("go depth 0 is an error",
+               lines == ["error depth must be positive: 0"], lines)
+        for size in (3, 300):
+            lines = await answer(f"position size {size}")
+            expect(f"position size {size} is an error",
+                   lines == [f"error size must be 4..16: {size}"], lines)
+        writer.write(b"quit\n")
+        await writer.drain()
+    finally:
+        writer.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Client and load test for the engine server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    commands = parser.add_subparsers(dest="command")
+    loader = commands.add_parser("load", help="synthetic load test")
+    loader.add_argument("--sessions", type=int, default=300)
+    loader.add_argument("--searches", type=int, default=5,
+                        help="searches per session")
+    loader.add_argument("--depth", type=int)
+    loader.add_argument("--movetime", type=int, default=20,
+                        help="milliseconds per search")
+    loader.add_argument("--random-plies", type=int, default=10)
+    loader.add_argument("--size", type=int, default=engine.N)
+    loader.add_argument("--wolves", type=int)
+    loader.add_argument("--seed", type=int, default=0)
+    checker = commands.add_parser("check", help="protocol conformance check")
+    for command in (loader, checker):
+        command.add_argument("--spawn", action="store_true",
+                             help="start server.py on --port for the test")
+        command.add_argument("--workers", type=int,
+                             help="server workers with --spawn")
+    args = parser.parse_args()
+
+    if args.command is None:
+        asyncio.run(interactive(args.host, args.port))
+        return
+
+    server = None
+    if args.spawn:
+        command = [sys.executable, "server.py", "--host", args.host,
+                   "--port", str(args.port)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command, cwd=sys.path[0] or None)
+    try:
+        if args.command == "check":
+            failures = asyncio.run(check(args.host, args.port))
+        else:
+            asyncio.run(load(args.host, args.port, args))
+            failures = 0
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
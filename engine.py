@@ -0,0 +1,1184 @@
+# -*- coding: utf-8 -*-
+
+# Spēles "Aita un vilki" noteikumi un mākslīgais intelekts
+# bez grafiskās saskarnes (bez PyQt5 importa)
+#
+# Galvenā saskarne:
+#     search(position, side, limits) -> (move, score, stats)
+# kur side ir "sheep" vai "wolfs" un gājiens ir (prev_sq, next_sq),
+# šūnas indekss sq = row * N + col
+#
+# Dēļa izmērs un vilku skaits ir spēles parametri (Geometry); moduļa
+# konstantes N, WOLF_TARGETS u.c. atbilst standarta 8x8 dēlim
+
+import csv
+import json
+import random
+import sys
+import time
+from collections import OrderedDict
+
+N = 8               # Standarta dēļa izmērs
+MAX_DEPTH = 6       # Fiksētais dziļums, ja laika ierobežojums nav uzdots
+TIME_LIMIT = 0.2    # Laiks vienam datora gājienam sekundēs (None - fiksēts dziļums)
+DEPTH_LIMIT = 64    # Iteratīvās padziļināšanas augšējā robeža
+TT_SIZE = 1 << 18   # Transpozīciju tabulas ierakstu skaits katrā līmenī
+EVAL_CACHE_SIZE = 1 << 14 # Attālumu karšu skaits heiristikas kešatmiņā
+PONDER_ROUNDS = 4   # Domāšanas pretinieka laikā kārtu skaits
+INF = 1000          # Novērtējums, ja aita nevar sasniegt augšējo rindu
+WIN = 2 * INF       # Izšķirta spēle: uzvara pēc d pusgājieniem ir WIN - d
+ASPIRATION = 2      # Aspirācijas loga pusplatums ap iepriekšējo novērtējumu
+
+# Meklēšanas režīmi:
+# "alphabeta" - alfa-beta ar pilnu logu katram gājienam
+# "pvs" - galvenā varianta meklēšana (NegaScout) ar aspirācijas logiem
+# "mtdf" - MTD(f): nulles loga meklēšanas ap iepriekšējās iterācijas minējumu
+SEARCH_MODES = ("alphabeta", "pvs", "mtdf")
+
+# Gājienu kārtošanas politikas:
+# "tt" - transpozīciju tabulas (galvenā varianta) gājiens pirmais
+# "killers" - divi nogriešanu izraisījušie gājieni katrā dziļumā
+# "history" - vēstures tabula pēc (no, uz) šūnām
+# "static" - heiristikas izmaiņa pēc gājiena
+ORDERING = frozenset(["tt", "killers", "history"])
+
+# Dēļi, kuros slēgta vilku līnija virs aitas nozīmē vilku uzvaru
+# (pārbaudīts, atrisinot visus šādus stāvokļus). Citos, piemēram, 6x6 ar
+# trim vilkiem, vilki var nonākt cugcvangā, tāpēc tur likumu neizmantojam
+CLOSED_LINE_WINS = frozenset([(8, 3), (8, 4), (9, 3), (10, 3)])
+
+# Figuru virzieni
+WOLF_DIRECTION = [(1, -1), (1, 1)]
+SHEEP_DIRECTION = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def square(row, col, n=N):
+    # Šūnas indekss bitu maskā
+    return row * n + col
+
+
+def isOutOfBorder(row, col, n=N):
+    return row < 0 or row >= n or col < 0 or col >= n
+
+
+class Geometry:
+    # Dēļa izmērs, vilku skaits un no tiem atkarīgās tabulas
+    # Maskas ir Python veselie skaitļi, tāpēc der arī dēļiem virs 64 šūnām
+    # Katram izmēram tabulas veidojam vienreiz (Geometry.get)
+
+    cache = {}
+
+    def __init__(self, n=N, wolf_count=None):
+        if wolf_count is None:
+            wolf_count = n // 2
+        dark = [sq for sq in range(n * n) if (sq // n + sq % n) % 2]
+        if n < 4 or not 1 <= wolf_count <= len(dark) // 2:
+            raise ValueError(f"unsupported board: {n}x{n} "
+                             f"with {wolf_count} wolves")
+        self.n = n
+        self.wolf_count = wolf_count
+        self.squares = n * n
+        self.max_moves = max(len(SHEEP_DIRECTION),  # Gājienu skaits stāvoklī
+                             len(WOLF_DIRECTION) * wolf_count)
+        self.dark = dark  # Tumšās šūnas: tikai uz tām var atrasties figūras
+
+        self.wolf_targets, self.wolf_masks = self.buildMoves(WOLF_DIRECTION)
+        self.sheep_targets, self.sheep_masks = self.buildMoves(
+            SHEEP_DIRECTION)
+        self.top_row = (1 << n) - 1  # Augšējās rindas maska
+        self.closed_line = (n, wolf_count) in CLOSED_LINE_WINS
+
+        # Maskas un nobīdes meklēšanai platumā ar bitu operācijām
+        self.free_board = (1 << n * n) - 1          # Visas dēļa šūnas
+        self.not_left = sum(1 << square(row, col, n) # Bez kreisās kolonnas
+                            for row in range(n) for col in range(1, n))
+        self.not_right = sum(1 << square(row, col, n) # Bez labās kolonnas
+                             for row in range(n) for col in range(n - 1))
+        self.up_left, self.up_right = n + 1, n - 1     # Nobīde pa labi (>>)
+        self.down_left, self.down_right = n - 1, n + 1 # Nobīde pa kreisi (<<)
+
+        # Zobrista atslēgas: katrai figūrai katrā šūnā un gājiena kārtai
+        keys = random.Random(2024)
+        self.wolf_keys = [keys.getrandbits(64) for _ in range(n * n)]
+        self.sheep_keys = [keys.getrandbits(64) for _ in range(n * n)]
+        self.side_key = keys.getrandbits(64) # Pievienojam, ja gājiens aitai
+
+        # Sākuma izvietojums: vilki tumšajās šūnās no augšējās rindas,
+        # aita apakšējā rindā pa kreisi no vidus (8x8 - šūnā (7, 2))
+        self.wolf_start = [divmod(sq, n) for sq in dark[:wolf_count]]
+        col = max(n // 2 - 2, 0)
+        if (n - 1 + col) % 2 == 0:
+            col += 1
+        self.sheep_start = (n - 1, col)
+
+    @classmethod
+    def get(cls, n=N, wolf_count=None):
+        # Kopīgs objekts katram izmēram
+        if wolf_count is None:
+            wolf_count = n // 2
+        geometry = cls.cache.get((n, wolf_count))
+        if geometry is None:
+            geometry = cls.cache[(n, wolf_count)] = cls(n, wolf_count)
+        return geometry
+
+    def __reduce__(self):
+        # Citā procesā atjaunojam to pašu kopīgo objektu, nevis tabulu kopiju
+        return Geometry.get, (self.n, self.wolf_count)
+
+    def __repr__(self):
+        return f"Geometry({self.n}, {self.wolf_count})"
+
+    def buildMoves(self, directions):
+        # Iepriekš aprēķinām gājienus no katras šūnas
+        # Atgriežam mērķa šūnu sarakstus (virzienu secībā) un to maskas
+        n = self.n
+        targets = []
+        masks = []
+        for sq in range(n * n):
+            row, col = divmod(sq, n)
+            moves = []
+            mask = 0
+            for direction in directions:
+                r, c = row + direction[0], col + direction[1]
+                if not isOutOfBorder(r, c, n):
+                    moves.append(square(r, c, n))
+                    mask |= 1 << square(r, c, n)
+            targets.append(tuple(moves))
+            masks.append(mask)
+        return targets, masks
+
+    def startPosition(self):
+        return Position.fromCells(self.sheep_start, self.wolf_start, self)
+
+
+# Standarta dēlis; moduļa konstantes saderībai ar galotņu tabulu u.c.
+DEFAULT = Geometry.get(N)
+WOLF_TARGETS, WOLF_MASKS = DEFAULT.wolf_targets, DEFAULT.wolf_masks
+SHEEP_TARGETS, SHEEP_MASKS = DEFAULT.sheep_targets, DEFAULT.sheep_masks
+TOP_ROW = DEFAULT.top_row
+
+# Transpozīciju tabulas novērtējuma tipi
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def toTable(score, depth):
+    # Uzvaras attālumu tabulā glabājam no stāvokļa, nevis no saknes
+    if score > INF:
+        return score + depth
+    if score < -INF:
+        return score - depth
+    return score
+
+
+def fromTable(score, depth):
+    if score > INF:
+        return score - depth
+    if score < -INF:
+        return score + depth
+    return score
+
+
+# Negamax: vilki maksimizē heiristiku, aita to minimizē
+OPPONENT = {"sheep": "wolfs", "wolfs": "sheep"}
+SIGN = {"sheep": -1, "wolfs": 1}
+
+
+class Position:
+    # Spēles stāvoklis bitu maskās
+    # Bits ar indeksu row * n + col atbilst šūnai (row, col)
+    __slots__ = ("wolfs", "sheep", "hash", "geometry")
+
+    def __init__(self, wolfs, sheep, geometry=DEFAULT):
+        self.wolfs = wolfs  # Vilku aizņemto šūnu maska
+        self.sheep = sheep  # Aitas šūnas maska (viens bits)
+        self.geometry = geometry # Dēļa izmērs un tabulas
+        self.hash = geometry.sheep_keys[self.sheepSquare()] # Zobrista atslēga
+        for sq in self.wolfSquares():
+            self.hash ^= geometry.wolf_keys[sq]
+
+    @classmethod
+    def fromCells(cls, sheep, wolfs, geometry=DEFAULT):
+        # Izveidojam stāvokli no (row, col) koordinātām
+        n = geometry.n
+        mask = 0
+        for wolf in wolfs:
+            mask |= 1 << square(wolf[0], wolf[1], n)
+        return cls(mask, 1 << square(sheep[0], sheep[1], n), geometry)
+
+    def copy(self):
+        return Position(self.wolfs, self.sheep, self.geometry)
+
+    def occupied(self):
+        return self.wolfs | self.sheep
+
+    def sheepSquare(self):
+        return self.sheep.bit_length() - 1
+
+    def wolfSquares(self):
+        # Vilku šūnas augošā secībā (tāpat kā rindu pārskatā)
+        squares = []
+        mask = self.wolfs
+        while mask:
+            low = mask & -mask
+            squares.append(low.bit_length() - 1)
+            mask ^= low
+        return squares
+
+    def sheepMoves(self):
+        # Aitas gājieni sheep_direction secībā
+        sq = self.sheepSquare()
+        geometry = self.geometry
+        free = geometry.sheep_masks[sq] & ~(self.wolfs | self.sheep)
+        return [(sq, t) for t in geometry.sheep_targets[sq] if free >> t & 1]
+
+    def wolfMoves(self, sq):
+        # Viena vilka gājieni wolf_direction secībā
+        geometry = self.geometry
+        free = geometry.wolf_masks[sq] & ~(self.wolfs | self.sheep)
+        return [(sq, t) for t in geometry.wolf_targets[sq] if free >> t & 1]
+
+    def getMoves(self, type):
+        # Visi gājieni: aitai vai visiem vilkiem pēc kārtas
+        if type == "sheep":
+            return self.sheepMoves()
+        moves = []
+        for sq in self.wolfSquares():
+            moves.extend(self.wolfMoves(sq))
+        return moves
+
+    def key(self, type):
+        # Stāvokļa un gājiena kārtas atslēga
+        if type == "sheep":
+            return self.hash ^ self.geometry.side_key
+        return self.hash
+
+    def doMove(self, move):
+        # Veicam gājienu (prev_sq, next_sq)
+        bits = (1 << move[0]) | (1 << move[1])
+        if self.sheep & bits:
+            self.sheep ^= bits
+            keys = self.geometry.sheep_keys
+        else:
+            self.wolfs ^= bits
+            keys = self.geometry.wolf_keys
+        self.hash ^= keys[move[0]] ^ keys[move[1]]
+
+    def undoMove(self, move):
+        # Atceļam gājienu; XOR ir pats sev inverss
+        self.doMove(move)
+
+    def isSheepOnTop(self):
+        return self.sheep & self.geometry.top_row != 0
+
+    def isSheepBlocked(self):
+        free = ~(self.wolfs | self.sheep)
+        return self.geometry.sheep_masks[self.sheepSquare()] & free == 0
+
+    def isWolfsBlocked(self):
+        free = ~(self.wolfs | self.sheep)
+        masks = self.geometry.wolf_masks
+        mask = self.wolfs
+        while mask:
+            low = mask & -mask
+            if masks[low.bit_length() - 1] & free:
+                return False
+            mask ^= low
+        return True
+
+
+def canMove(position, move):
+    # Pārbaudām, vai šūnā move = (row, col) var pārvietoties
+    n = position.geometry.n
+    if isOutOfBorder(move[0], move[1], n):
+        return False
+
+    return not position.occupied() >> square(move[0], move[1], n) & 1
+
+
+def doMove(position, prev_pos, next_pos):
+    # Veicam gājienu (row, col) koordinātās
+    n = position.geometry.n
+    if canMove(position, next_pos):
+        position.doMove((square(prev_pos[0], prev_pos[1], n),
+                         square(next_pos[0], next_pos[1], n)))
+
+
+def getPossibleMoves(position, figure):
+    # Figūras šūnā figure = (row, col) iespējamie gājieni
+    n = position.geometry.n
+    sq = square(figure[0], figure[1], n)
+    if position.sheep >> sq & 1:
+        moves = position.sheepMoves()
+    else:
+        moves = position.wolfMoves(sq)
+    return [divmod(move[1], n) for move in moves]
+
+
+def checkVictory(position):
+    # Uzvaras apstākļu pārbaude
+    # Atgriežam uzvarētāju ("sheep" vai "wolfs") vai None
+    if position.isSheepOnTop():
+        return "sheep"
+    if position.isSheepBlocked():
+        return "wolfs"
+    if position.isWolfsBlocked():
+        return "sheep"
+    return None
+
+
+class Game:
+    # Spēles gaita: viens stāvoklis, gājiena kārta un gājienu vēsture
+    # Gājienus atceļam un atkārtojam inkrementāli, stāvokli nepārbūvējot
+
+    def __init__(self, geometry=DEFAULT):
+        self.geometry = geometry
+        self.position = geometry.startPosition()
+        self.side = "sheep"   # Kuram jāiet
+        self.moves = []       # Veiktie gājieni (atcelšanas kaudze)
+        self.undone = []      # Atceltie gājieni atkārtošanai
+
+    def doMove(self, move):
+        # Jauns gājiens padara atceltos gājienus nederīgus
+        self.position.doMove(move)
+        self.moves.append(move)
+        self.undone = []
+        self.side = OPPONENT[self.side]
+
+    def undo(self):
+        # Atceļam pēdējo gājienu; atgriežam to vai None
+        if not self.moves:
+            return None
+        move = self.moves.pop()
+        self.position.undoMove(move)
+        self.undone.append(move)
+        self.side = OPPONENT[self.side]
+        return move
+
+    def redo(self):
+        # Atkārtojam pēdējo atcelto gājienu; atgriežam to vai None
+        if not self.undone:
+            return None
+        move = self.undone.pop()
+        self.position.doMove(move)
+        self.moves.append(move)
+        self.side = OPPONENT[self.side]
+        return move
+
+    def winner(self):
+        return checkVictory(self.position)
+
+
+def decided(position, side, evaluate=None):
+    # Statiski izšķirta spēle: (uzvarētājs, pusgājieni līdz beigām) vai None
+    # side - gājiena kārta; evaluate - heiristika (piem. EvalCache.evaluate)
+    winner = checkVictory(position)
+    if winner is not None:
+        return winner, 0
+
+    n = position.geometry.n
+    wolfs = position.wolfs
+    row = (position.sheep.bit_length() - 1) // n
+    if row <= ((wolfs & -wolfs).bit_length() - 1) // n:
+        # Aita nav zemāk par nevienu vilku: vilki kustas tikai uz leju,
+        # tāpēc ceļš uz augšējo rindu paliek brīvs
+        return "sheep", 2 * row - (side == "sheep")
+
+    if (position.geometry.closed_line
+            and row > (wolfs.bit_length() - 1) // n
+            and (evaluate or heuristic)(position) == INF):
+        # Visi vilki virs aitas un augšējā rinda nav sasniedzama.
+        # Spēle beidzas ne vēlāk, kā vilki izlieto visus gājienus uz leju
+        moves = sum(n - 1 - sq // n for sq in position.wolfSquares())
+        return "wolfs", 2 * moves + (side == "sheep")
+    return None
+
+
+def winScore(winner, plies):
+    # Izšķirtas spēles novērtējums no vilku viedokļa; ātrāka uzvara labāka
+    if winner == "wolfs":
+        return WIN - plies
+    return plies - WIN
+
+
+class SearchTimeout(Exception):
+    # Meklēšanai atvēlētais laiks ir beidzies
+    pass
+
+
+class TranspositionTable:
+    # Transpozīciju tabula ar divu līmeņu aizvietošanu:
+    # dziļuma prioritātes līmenis un vienmēr aizvietojamais līmenis
+    # Ieraksts: (atslēga, dziļums, novērtējums, tips, labākais gājiens)
+
+    def __init__(self, size=TT_SIZE):
+        # Izmēru noapaļojam līdz divnieka pakāpei
+        self.size = 1 << max(0, size - 1).bit_length()
+        self.mask = self.size - 1
+        self.clear()
+
+    def clear(self):
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def probe(self, key):
+        # Meklējam ierakstu abos līmeņos
+        index = key & self.mask
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = self.recent[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, type, move):
+        # Dziļākus rezultātus glabājam pirmajā līmenī,
+        # pārējos - otrajā
+        self.stores += 1
+        index = key & self.mask
+        entry = (key, depth, score, type, move)
+        deep = self.deep[index]
+        if deep is None or depth >= deep[1]:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
+    def hitRate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+
+class Tree:
+    # Risinājumu koks (tikai atkļūdošanas režīmā, sk. Engine.record)
+    __slots__ = ("score", "type", "move", "children")
+
+    def __init__(self, type, move, score):
+        # Konstruktors
+        self.score = score  # Gajiena novertešana
+        self.type = type    # Figuras tips
+        self.move = move    # Gajiens (prev_pos, next_pos)  
+
+        self.children = []  # Bērnmezglu saraksts
+
+    def addChild(self, child):
+        # Mezgla pievienošana
+        self.children.append(child)
+
+
+def heuristic(position):
+    # Heiristiskā funkcija izvērtē, cik gājienu laikā aita var sasniegt uzvaru
+    # ar nosacījumu, ka vilki ir nekustīgi
+    # Jo mazāk jo labāk
+    # Meklēšana platumā ar bitu maskām: katrs slānis ir nobīdes un maskas
+    # Stāvoklis netiek mainīts, tāpēc nav vajadzīga atiestatīšana
+    g = position.geometry
+    sheep = position.sheep
+    top_row = g.top_row
+    if sheep & top_row:
+        # Aita augšējā rindā
+        # Mērķis sasniegts
+        return 0
+
+    free = g.free_board & ~position.wolfs # Šūnas, kurās aita var iet
+    not_left, not_right = g.not_left, g.not_right
+    up_left, up_right = g.up_left, g.up_right
+    down_left, down_right = g.down_left, g.down_right
+    reached = sheep                     # Sasniegto šūnu maska
+    frontier = sheep                    # Pašreizējais slānis
+    distance = 0
+
+    while True:
+        distance += 1
+        left = frontier & not_left
+        right = frontier & not_right
+        frontier = ((left >> up_left | right >> up_right |
+                     left << down_left | right << down_right)
+                    & free & ~reached)
+        if not frontier:
+            # Augšējā rinda nav sasniedzama
+            return INF
+        if frontier & top_row:
+            # Sasniegta augšējā rinda
+            return distance
+        reached |= frontier
+
+
+def distanceMap(wolfs, geometry=DEFAULT):
+    # Attālums līdz augšējai rindai no katras šūnas, ja vilki nekustas
+    # Aitas gājieni ir simetriski, tāpēc meklējam platumā no augšējās rindas
+    g = geometry
+    free = g.free_board & ~wolfs
+    distances = [INF] * g.squares
+    frontier = g.top_row & free
+    reached = frontier
+    distance = 0
+
+    while frontier:
+        mask = frontier
+        while mask:
+            low = mask & -mask
+            distances[low.bit_length() - 1] = distance
+            mask ^= low
+        distance += 1
+        left = frontier & g.not_left
+        right = frontier & g.not_right
+        frontier = ((left >> g.up_left | right >> g.up_right |
+                     left << g.down_left | right << g.down_right)
+                    & free & ~reached)
+        reached |= frontier
+
+    return distances
+
+
+class EvalCache:
+    # Heiristikas kešatmiņa: pilna attālumu karte katram vilku izvietojumam
+    # Ierobežota ar LRU politiku; novērtējums ir viena uzmeklēšana kartē
+    # Kartes ir vienam dēļa izmēram; mainoties izmēram, kešatmiņu iztīrām
+
+    def __init__(self, size=EVAL_CACHE_SIZE):
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        self.geometry = None
+        self.maps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, position):
+        # Tas pats, kas heuristic(position)
+        if position.geometry is not self.geometry:
+            self.clear()
+            self.geometry = position.geometry
+        maps = self.maps
+        wolfs = position.wolfs
+        distances = maps.get(wolfs)
+        if distances is None:
+            self.misses += 1
+            distances = distanceMap(wolfs, self.geometry)
+            maps[wolfs] = distances
+            if len(maps) > self.size:
+                maps.popitem(last=False)
+        else:
+            self.hits += 1
+            maps.move_to_end(wolfs)
+        return distances[position.sheep.bit_length() - 1]
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def memory(self):
+        # Aptuvenais karšu aizņemtais atmiņas apjoms baitos
+        if not self.maps:
+            return sys.getsizeof(self.maps)
+        wolfs, distances = next(iter(self.maps.items()))
+        entry = sys.getsizeof(wolfs) + sys.getsizeof(distances)
+        return sys.getsizeof(self.maps) + len(self.maps) * entry
+
+
+class Limits:
+    # Meklēšanas ierobežojumi
+    # time - laiks sekundēs; ja None, meklējam fiksētā dziļumā max_depth
+    # max_depth - tāpat kā MAX_DEPTH: lapas ir dziļumā max_depth + 1
+
+    def __init__(self, max_depth=None, time=None):
+        self.max_depth = max_depth
+        self.time = time
+
+
+class Stats:
+    # Meklēšanas statistika
+
+    def __init__(self):
+        self.nodes = 0      # Apmeklēto mezglu skaits
+        self.evals = 0      # Lapu novērtējumu (heiristikas) skaits
+        self.decided = 0    # Statiski izšķirto stāvokļu skaits
+        self.cutoffs = []   # Beta nogriešanas pēc gājiena kārtas numura
+        self.tt_hits = 0    # Transpozīciju tabulā atrasto ierakstu skaits
+        self.depth = 0      # Pabeigtās iterācijas dziļums pusgājienos
+        self.max_depth = 0  # Lielākais sasniegtais dziļums pusgājienos
+        self.elapsed = 0.0  # Meklēšanas laiks sekundēs
+        self.pv = []        # Galvenais variants (gājienu virkne)
+
+    @property
+    def nps(self):
+        # Mezgli sekundē
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def asDict(self):
+        return {"nodes": self.nodes, "evals": self.evals,
+                "decided": self.decided, "cutoffs": self.cutoffs, "tt_hits": self.tt_hits,
+                "depth": self.depth, "max_depth": self.max_depth,
+                "elapsed": self.elapsed, "nps": self.nps, "pv": self.pv}
+
+    def __str__(self):
+        # Īss kopsavilkums statusa rindai
+        total = sum(self.cutoffs)
+        first = self.cutoffs[0] / total if total else 0.0
+        return (f"depth {self.depth}/{self.max_depth}, "
+                f"{self.nodes:,} nodes, {self.nps / 1000:,.0f} kN/s, "
+                f"{self.evals:,} evals, {self.decided:,} decided, "
+                f"{self.tt_hits:,} TT hits, "
+                f"{total:,} cutoffs ({first:.0%} first move), "
+                f"{self.elapsed * 1000:.0f} ms")
+
+
+class TraceLog:
+    # Meklēšanas statistikas žurnāls pa gājieniem profilēšanai
+    # Formāts pēc faila paplašinājuma: .csv vai JSON rindas
+
+    FIELDS = ("side", "move", "score", "nodes", "evals", "decided",
+              "cutoffs", "tt_hits", "depth", "max_depth", "elapsed", "nps", "pv")
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.csv = None
+        if path.endswith(".csv"):
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(self.FIELDS)
+
+    def write(self, side, move, score, stats):
+        row = {"side": side, "move": move, "score": score}
+        row.update(stats.asDict())
+        if self.csv is None:
+            self.file.write(json.dumps(row) + "\n")
+        else:
+            self.csv.writerow([json.dumps(row[field])
+                               if isinstance(row[field], (list, tuple))
+                               else row[field] for field in self.FIELDS])
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Engine:
+    # Meklēšanas dzinējs
+    # Transpozīciju tabula saglabājas starp meklēšanām
+
+    def __init__(self, tt_size=TT_SIZE, record=False,
+                 eval_cache_size=EVAL_CACHE_SIZE, ordering=ORDERING,
+                 tablebase=None, mode="pvs", aspiration=ASPIRATION,
+                 evaluation=None, book=None, batch=None):
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"unknown search mode: {mode}")
+        if batch is not None and evaluation not in (None, heuristic):
+            # Pakešu novērtējums vienmēr ir iebūvētā heiristika; citu
+            # novērtējumu lapām tas klusi aizstātu
+            raise ValueError("batch evaluation requires the default "
+                             "heuristic evaluation")
+        self.tt = TranspositionTable(tt_size)
+        self.mode = mode              # Meklēšanas režīms (SEARCH_MODES)
+        self.pvs = mode != "alphabeta"
+        self.aspiration = aspiration  # 0 vai None - bez aspirācijas logiem
+        self.tablebase = tablebase    # Galotņu tabula (tablebase.Tablebase)
+        self.book = book              # Atklātnes grāmata (book.Book)
+        self.eval_cache = EvalCache(eval_cache_size)
+        # Novērtējuma funkcija (position) -> vesels skaitlis 0..INF;
+        # pēc noklusējuma heiristika caur kešatmiņu
+        self.evaluate = evaluation or self.eval_cache.evaluate
+        # Pakešu novērtējums (sheep_squares, wolfs, geometry) -> novērtējumi
+        # lapām zem horizonta (piem. batch.evaluateBatch); None - pa vienam
+        self.batch = batch
+        self.ordering = frozenset(ordering) # Ieslēgtās kārtošanas politikas
+        self.killers = []             # Divi slepkavas gājieni katrā dziļumā
+        self.geometry = None          # Dēļa izmērs, kuram ir vēstures tabula
+        self.squares = 0              # Šūnu skaits vēstures indeksam
+        self.history = {}             # Vēsture pēc (no, uz) šūnām
+        self.setGeometry(DEFAULT)
+        self.record = record          # Saglabāt risinājumu koku (atkļūdošanai)
+        self.tree = None              # Pēdējās pabeigtās iterācijas koks
+        self.node = None              # Pašreizējais koka mezgls
+        self.pv = [[]]                # Galvenā varianta tabula pa dziļumiem
+        self.position = None          # Meklēšanas stāvoklis
+        self.search_depth = MAX_DEPTH # Pašreizējās iterācijas dziļums
+        self.deadline = None          # Meklēšanas beigu laiks
+        self.nodes = 0                # Apmeklēto mezglu skaits
+        self.evals = 0                # Lapu novērtējumu skaits
+        self.decided = 0              # Statiski izšķirtie stāvokļi
+        self.cutoffs = []             # Nogriešanas pēc gājiena kārtas numura
+        self.max_ply = 0              # Dziļākais izšķirtais stāvoklis
+        self.stopped = False          # Meklēšanas atcelšanas karodziņš
+        self.finishing = False        # Apturēta, bet rezultāts saglabājas
+        self.best_move = None         # Saknes labākais gājiens
+        self.best_score = None        # Saknes novērtējums
+        self.ponder_results = {}      # Atbildes, atrastas pretinieka laikā
+
+    def clear(self):
+        # Aizmirstam iepriekšējo spēļu rezultātus
+        self.tt.clear()
+        self.eval_cache.clear()
+        self.ponder_results = {}
+        for table in self.history.values():
+            table[:] = [0] * len(table)
+
+    def setGeometry(self, geometry):
+        # Pielāgojam no dēļa izmēra atkarīgās tabulas
+        if geometry is self.geometry:
+            return
+        self.geometry = geometry
+        self.squares = geometry.squares
+        size = geometry.squares * geometry.squares
+        self.history = {"sheep": [0] * size, "wolfs": [0] * size}
+
+    def stop(self):
+        # Kooperatīva atcelšana; drīkst izsaukt no cita pavediena
+        # Karodziņu pirms nākamās meklēšanas nomet izsaucējs
+        self.stopped = True
+
+    def finish(self):
+        # Kā stop, bet search atgriež pēdējās pabeigtās iterācijas gājienu
+        # Abus karodziņus pirms nākamās meklēšanas nomet izsaucējs
+        self.finishing = True
+        self.stopped = True
+
+    def min_max(self, type, depth, alpha, beta):
+        # Minimaksa algoritms ar alfa beta nogriešanu negamax formā
+        # Novērtējums ir no gājiena veicēja viedokļa:
+        # vilkiem - heiristika, aitai - heiristika ar pretēju zīmi
+        position = self.position
+        pv = self.pv
+        pv[depth] = []
+
+        self.nodes += 1
+        if not self.nodes & 1023 and (self.stopped or
+                (self.deadline is not None and
+                 time.perf_counter() >= self.deadline)):
+            # Meklēšana atcelta vai laiks beidzies, pārtraucam iterāciju
+            raise SearchTimeout()
+
+        if depth:
+            # Izšķirtus stāvokļus novērtējam precīzi un tālāk nemeklējam
+            # Saknē meklējam vienmēr, lai iegūtu gājienu
+            result = decided(position, type, self.eval_cache.evaluate)
+            if result is not None:
+                self.decided += 1
+                if depth > self.max_ply:
+                    self.max_ply = depth
+                return SIGN[type] * winScore(result[0], depth + result[1])
+
+        if depth > self.search_depth:
+            # Sasniegts maksimālais meklēšanas dziļums
+            # Izmantojam heiristiku un izejam no rekursijas
+            self.evals += 1
+            return SIGN[type] * self.evaluate(position)
+
+        # Pārbaudām transpozīciju tabulu
+        remaining = self.search_depth + 1 - depth # Atlikušais dziļums
+        key = position.key(type)
+        entry = self.tt.probe(key)
+        tt_move = None
+        if entry:
+            tt_move = entry[4]
+            if depth > 0 and entry[1] >= remaining:
+                # Saknē vienmēr meklējam, lai iegūtu gājienu
+                score = fromTable(entry[2], depth)
+                if entry[3] == EXACT:
+                    return score
+                if entry[3] == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if beta <= alpha:
+                    return score
+
+        window = (alpha, beta) # Logs novērtējuma tipa noteikšanai
+
+        moves = position.getMoves(type)
+        if self.ordering and len(moves) > 1:
+            self.orderMoves(moves, type, depth, tt_move)
+
+        if len(pv) <= depth + 1:
+            pv.append([])
+
+        other = OPPONENT[type]
+        scores = None
+        if (self.batch is not None and depth == self.search_depth
+                and not self.record):
+            # Visi bērni ir lapas: tos novērtējam vienā paketē
+            scores = iter(self.leafScores(moves, other, depth + 1))
+        best_move = None  # Labākais gājiens
+        best_score = float("-inf")
+        for move in moves:
+            if scores is not None:
+                result = next(scores)
+            else:
+                position.doMove(move)
+                if self.record:
+                    # Izveidojam risinājuma koka bērnmezglu
+                    parent = self.node
+                    child = Tree(other, move, 0)
+                    parent.addChild(child)
+                    self.node = child
+                if best_move is None or not self.pvs:
+                    result = -self.min_max(other, depth + 1, -beta, -alpha)
+                else:
+                    # Galvenā varianta meklēšana: pārējos gājienus pārbaudām
+                    # ar nulles logu un pārmeklējam tikai, ja tie ir labāki
+                    result = -self.min_max(other, depth + 1,
+                                           -alpha - 1, -alpha)
+                    if alpha < result < beta:
+                        if self.record:
+                            child.children = []
+                        result = -self.min_max(other, depth + 1,
+                                               -beta, -alpha)
+                if self.record:
+                    child.score = SIGN[type] * result
+                    self.node = parent
+                # Atcelt gajienu
+                position.undoMove(move)
+
+            if best_move is None or result > best_score:
+                # Meklējam labāko gājienu
+                best_move = move
+                best_score = result
+                pv[depth] = [move] + pv[depth + 1]
+                if result > alpha:
+                    alpha = result
+
+                    # Alfa-beta nogriešana
+                    if alpha >= beta:
+                        self.cutoffs[moves.index(move)] += 1
+                        self.cutoff(move, type, depth, remaining)
+                        break
+
+        if best_move is None:
+            # Nav iespējamo gājienu - spēle beigusies, gājējs zaudējis
+            # (dziļāk par sakni šos stāvokļus jau atrod decided)
+            return depth - WIN
+
+        # Saglabājam rezultātu transpozīciju tabulā
+        stored = toTable(best_score, depth)
+        if best_score <= window[0]:
+            self.tt.store(key, remaining, stored, UPPER, best_move)
+        elif best_score >= window[1]:
+            self.tt.store(key, remaining, stored, LOWER, best_move)
+        else:
+            self.tt.store(key, remaining, stored, EXACT, best_move)
+
+        if depth == 0:
+            # Saknē atceramies labāko gājienu
+            self.best_move = best_move
+            self.best_score = SIGN[type] * best_score
+
+        return best_score
+
+    def leafScores(self, moves, type, depth):
+        # Lapu novērtējumi no vecākmezgla viedokļa (kā -min_max katrai lapai)
+        # type - gājiena kārta lapās. Izšķirtos stāvokļus novērtējam
+        # uzreiz, pārējos savācam masīvos un novērtējam ar self.batch
+        position = self.position
+        sign = SIGN[type]
+        scores = [None] * len(moves)
+        pending = []
+        sheep_squares = []
+        wolfs = []
+        for index, move in enumerate(moves):
+            position.doMove(move)
+            result = decided(position, type, self.eval_cache.evaluate)
+            if result is not None:
+                self.decided += 1
+                if depth > self.max_ply:
+                    self.max_ply = depth
+                scores[index] = -sign * winScore(result[0],
+                                                 depth + result[1])
+            else:
+                pending.append(index)
+                sheep_squares.append(position.sheepSquare())
+                wolfs.append(position.wolfs)
+            position.undoMove(move)
+        self.nodes += len(moves)
+        self.pv[depth] = []
+
+        if pending:
+            self.evals += len(pending)
+            values = self.batch(sheep_squares, wolfs, position.geometry)
+            for index, value in zip(pending, values):
+                scores[index] = -sign * int(value)
+
+        if self.stopped or (self.deadline is not None and
+                            time.perf_counter() >= self.deadline):
+            raise SearchTimeout()
+        return scores
+
+    def orderMoves(self, moves, type, depth, tt_move):
+        # Kārtojam gājienus pēc ieslēgtajām politikām (labākie pirmie)
+        # Vienādas prioritātes gājieni saglabā sākotnējo secību
+        ordering = self.ordering
+        if "tt" not in ordering:
+            tt_move = None
+        killers = self.killers[depth] if "killers" in ordering else ()
+        history = self.history[type] if "history" in ordering else None
+        static = "static" in ordering
+        squares = self.squares
+        position = self.position
+        evaluate = self.evaluate
+        sign = SIGN[type]
+
+        def priority(move):
+            if move == tt_move:
+                rank = 3
+            elif move in killers:
+                rank = 2 if move == killers[0] else 1
+            else:
+                rank = 0
+            score = history[move[0] * squares + move[1]] if history else 0
+            value = 0
+            if static:
+                position.doMove(move)
+                value = sign * evaluate(position)
+                position.undoMove(move)
+            return (rank, score, value)
+
+        moves.sort(key=priority, reverse=True)
+
+    def cutoff(self, move, type, depth, remaining):
+        # Atceramies nogriešanu izraisījušo gājienu
+        killers = self.killers[depth]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[type][move[0] * self.squares + move[1]] += (
+            remaining * remaining)
+
+    def searchRoot(self, side, guess):
+        # Viena iterācija saknē pēc izvēlētā režīma
+        # guess - iepriekšējās iterācijas novērtējums no side viedokļa
+        if guess is not None and self.mode == "mtdf":
+            return self.mtdf(side, guess)
+        if guess is not None and self.aspiration:
+            # Aspirācijas logs; ja rezultāts ārpus tā, meklējam ar pilnu logu
+            alpha = guess - self.aspiration
+            beta = guess + self.aspiration
+            score = self.min_max(side, 0, alpha, beta)
+            if alpha < score < beta:
+                return score
+        return self.min_max(side, 0, float("-inf"), float("inf"))
+
+    def mtdf(self, side, guess):
+        # MTD(f): tuvinām novērtējumu ar nulles loga meklēšanām
+        # Gājiens ir derīgs tikai no meklēšanas, kas pārsniedza beta
+        lower = float("-inf")
+        upper = float("inf")
+        score = guess
+        best_move = None
+        while lower < upper:
+            beta = score + 1 if score == lower else score
+            score = self.min_max(side, 0, beta - 1, beta)
+            if score < beta:
+                upper = score
+            else:
+                lower = score
+                best_move = self.best_move
+        if best_move is not None:
+            self.best_move = best_move
+            self.best_score = SIGN[side] * score
+        return score
+
+    def searchMove(self, position, side, move, depth, alpha, deadline=None):
+        # Novērtējam vienu saknes gājienu ar logu (alpha, +inf)
+        # Izmanto paralēlā meklēšana; novērtējums no side viedokļa
+        # vai None, ja laiks beidzies
+        self.position = position.copy()
+        self.position.doMove(move)
+        self.search_depth = depth
+        self.deadline = deadline
+        self.nodes = 0
+        self.setGeometry(position.geometry)
+        self.cutoffs = [0] * position.geometry.max_moves
+        self.pv = [[] for _ in range(depth + 2)]
+        self.killers = [[None, None] for _ in range(depth + 2)]
+        try:
+            return -self.min_max(OPPONENT[side], 1,
+                float("-inf"), -alpha)
+        except SearchTimeout:
+            return None
+        finally:
+            self.deadline = None
+
+    def search(self, position, side, limits=None):
+        # Iteratīvā padziļināšana: meklējam dziļumā 1, 2, 3...
+        # kamēr nav beidzies atvēlētais laiks
+        # Atgriežam pēdējās pabeigtās iterācijas labāko gājienu,
+        # tā novērtējumu un statistiku; (None, None, stats), ja atcelta
+        if limits is None:
+            limits = Limits(MAX_DEPTH, TIME_LIMIT)
+        stats = Stats()
+        start = time.perf_counter()
+        self.nodes = 0
+        self.evals = 0
+        self.decided = 0
+        self.setGeometry(position.geometry)
+        self.cutoffs = [0] * position.geometry.max_moves
+        self.max_ply = 0
+        tt_hits = self.tt.hits
+
+        if self.tablebase is not None:
+            # Ja stāvoklis ir galotņu tabulā, meklēšana nav vajadzīga
+            result = self.tablebase.bestMove(position, side)
+            if result is not None:
+                move, winner, distance = result
+                stats.depth = distance
+                stats.pv = [move]
+                stats.elapsed = time.perf_counter() - start
+                return move, winScore(winner, distance), stats
+
+        if self.book is not None:
+            # Atklātnē gājiens jau atrasts dziļā meklēšanā
+            result = self.book.probe(position, side)
+            if result is not None:
+                move, score, depth = result
+                stats.depth = depth
+                stats.pv = [move]
+                stats.elapsed = time.perf_counter() - start
+                return move, score, stats
+
+        if limits.time is None:
+            # Fiksēta dziļuma meklēšana
+            depths = [MAX_DEPTH if limits.max_depth is None
+                      else limits.max_depth]
+        else:
+            depths = range(DEPTH_LIMIT if limits.max_depth is None
+                           else limits.max_depth + 1)
+
+        # Slepkavas gājieni ir derīgi tikai vienā meklēšanā,
+        # vēsturi novecojam
+        self.killers = [[None, None] for _ in range(max(depths) + 2)]
+        for table in self.history.values():
+            table[:] = [value >> 1 for value in table]
+
+        self.deadline = None # Pirmo iterāciju vienmēr pabeidzam
+        best_move = None
+        best_score = None
+        guess = None         # Iepriekšējās iterācijas novērtējums
+        for depth in depths:
+            self.search_depth = depth
+            self.position = position.copy() # Pārtraukta iterācija bojā stāvokli
+            self.best_move = None
+            self.best_score = None
+            if self.record:
+                self.node = Tree(side, None, 0)
+                root = self.node
+            leaves = self.evals
+            try:
+                guess = self.searchRoot(side, guess)
+            except SearchTimeout:
+                break
+            finally:
+                # Lapas uz horizonta ir dziļumā depth + 1
+                if self.evals > leaves:
+                    stats.max_depth = depth + 1
+            best_move = self.best_move
+            best_score = self.best_score
+            stats.depth = depth + 1
+            stats.pv = self.pv[0]
+            if self.record:
+                root.score = best_score
+                self.tree = root
+            if best_score is not None and WIN - abs(best_score) <= depth + 1:
+                # Spēles beigas ir meklēšanas horizontā, dziļāk nav jēgas
+                break
+            if limits.time is not None:
+                self.deadline = start + limits.time
+                if time.perf_counter() >= self.deadline:
+                    break
+
+        self.deadline = None
+        stats.nodes = self.nodes
+        stats.evals = self.evals
+        stats.decided = self.decided
+        stats.cutoffs = self.cutoffs
+        stats.tt_hits = self.tt.hits - tt_hits
+        stats.max_depth = max(stats.max_depth, self.max_ply)
+        stats.elapsed = time.perf_counter() - start
+        if self.stopped and not self.finishing:
+            return None, None, stats
+        return best_move, best_score, stats
+
+
+    def ponder(self, position, side, limits=None, rounds=PONDER_ROUNDS):
+        # Domājam pretinieka gājiena laikā
+        # side - pretinieks, kurš pašlaik izvēlas gājienu. Katram viņa
+        # gājienam meklējam savu atbildi ar limits; ja tas ir laika
+        # ierobežojums, katrā nākamajā kārtā laiks divkāršojas.
+        # Rezultāti ponder_results: {stāvokļa atslēga: (gājiens, novērtējums,
+        # statistika)}; meklēšanu pārtrauc stop()
+        if limits is None:
+            limits = Limits(MAX_DEPTH, TIME_LIMIT)
+        if limits.time is None:
+            rounds = 1
+        results = self.ponder_results = {}
+        other = OPPONENT[side]
+        replies = position.getMoves(side)
+        for round in range(rounds):
+            for reply in replies:
+                child = position.copy()
+                child.doMove(reply)
+                if checkVictory(child) is not None:
+                    continue
+                budget = Limits(limits.max_depth, limits.time and
+                                limits.time * 2 ** round)
+                move, score, stats = self.search(child, other, budget)
+                if self.stopped:
+                    return results
+                results[child.key(other)] = (move, score, stats)
+        return results
+
+    def pondered(self, position, side):
+        # Atbilde no domāšanas pretinieka laikā vai None
+        return self.ponder_results.get(position.key(side))
+
+    def analyse(self, position, side, max_depth=DEPTH_LIMIT):
+        # Visu saknes gājienu novērtēšana (multi-PV) ar iteratīvo padziļināšanu
+        # Katru gājienu meklējam ar pilnu logu, lai novērtējums būtu precīzs;
+        # iepriekšējo dziļumu rezultāti paliek transpozīciju tabulā un nosaka
+        # gājienu secību. Pēc katra gājiena atdodam (dziļums, gājiens,
+        # novērtējums no vilku viedokļa, galvenais variants); apstādina stop()
+        self.nodes = 0
+        self.evals = 0
+        self.decided = 0
+        self.max_ply = 0
+        self.setGeometry(position.geometry)
+        self.cutoffs = [0] * position.geometry.max_moves
+        self.killers = [[None, None] for _ in range(max_depth + 2)]
+        for table in self.history.values():
+            table[:] = [value >> 1 for value in table]
+        self.deadline = None
+
+        sign = SIGN[side]
+        other = OPPONENT[side]
+        moves = position.getMoves(side)
+        scores = {}
+        for depth in range(max_depth):
+            self.search_depth = depth
+            # Labākie iepriekšējā dziļumā gājieni pirmie
+            moves.sort(key=lambda move: sign * scores.get(move, 0),
+                       reverse=True)
+            for move in moves:
+                if self.stopped:
+                    return
+                self.position = position.copy()
+                self.position.doMove(move)
+                self.pv = [[] for _ in range(depth + 2)]
+                try:
+                    score = -self.min_max(other, 1,
+                                          float("-inf"), float("inf"))
+                except SearchTimeout:
+                    return
+                scores[move] = sign * score
+                yield depth + 1, move, sign * score, [move] + self.pv[1]
+            if all(WIN - abs(score) <= depth + 1 for score in scores.values()):
+                # Visu gājienu iznākums ir meklēšanas horizontā
+                return
+
+
+def search(position, side, limits=None):
+    # Vienreizēja meklēšana ar jaunu dzinēju
+    return Engine().search(position, side, limits)
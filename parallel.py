@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Paralēlā meklēšana: saknes gājienus sadalām starp procesiem
+#
+# Katram procesam ir savs Engine ar savu transpozīciju tabulu.
+# Labāko saknes novērtējumu (alfa) procesi dala caur kopīgu atmiņu,
+# tāpēc vēlāk sāktie gājieni tiek meklēti ar šaurāku logu.
+# Ar vienu procesu rezultāts sakrīt ar secīgo alfa-beta meklēšanu saknē.
+#
+# Palaišana (mērogošanas etalons): python parallel.py
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+from engine import (MAX_DEPTH, TIME_LIMIT, DEPTH_LIMIT, TT_SIZE, SIGN,
+    Engine, Limits, Stats)
+
+WORKERS = multiprocessing.cpu_count()
+
+_engine = None  # Procesa dzinējs
+_alpha = None   # Kopīgā saknes alfa vērtība
+
+
+def _init(tt_size, alpha):
+    # Procesa inicializācija
+    global _engine, _alpha
+    _engine = Engine(tt_size)
+    _alpha = alpha
+
+
+def _rootMove(position, side, move, depth, deadline):
+    # Novērtējam saknes gājienu un atjaunojam kopīgo alfa vērtību
+    # deadline ir sienas pulksteņa laiks (time.time), kopīgs visiem procesiem
+    alpha = _alpha.value
+    if deadline is not None:
+        deadline = time.perf_counter() + (deadline - time.time())
+    score = _engine.searchMove(position, side, move, depth, alpha, deadline)
+    if score is not None:
+        with _alpha.get_lock():
+            if score > _alpha.value:
+                _alpha.value = score
+    return score, alpha, _engine.nodes
+
+
+class ParallelSearch:
+    # Meklēšana vairākos procesos ar tādu pašu saskarni kā Engine.search
+
+    def __init__(self, workers=WORKERS, tt_size=TT_SIZE):
+        self.workers = workers
+        self.alpha = multiprocessing.Value("d", float("-inf"))
+        self.pool = ProcessPoolExecutor(workers, initializer=_init,
+                                        initargs=(tt_size, self.alpha))
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def searchDepth(self, position, side, moves, depth, deadline):
+        # Viena iterācija: visi saknes gājieni dotajā dziļumā
+        # Atgriežam (gājiens, novērtējums, mezgli) vai None, ja laiks beidzies
+        self.alpha.value = float("-inf")
+        futures = [self.pool.submit(_rootMove, position, side, move,
+                                    depth, deadline) for move in moves]
+        results = [future.result() for future in futures]
+        if any(score is None for score, _, _ in results):
+            return None
+
+        # Precīzi ir tikai tie novērtējumi, kas pārsniedza sākuma alfa;
+        # pārējie ir augšējās robežas. Vienādiem ņemam pirmo pēc secības.
+        nodes = sum(result[2] for result in results)
+        best = None
+        for move, (score, alpha, _) in zip(moves, results):
+            if score > alpha and (best is None or score > best[1]):
+                best = (move, score)
+        if best is None:
+            best = (moves[0], results[0][0])
+        return best[0], best[1], nodes
+
+    def search(self, position, side, limits=None):
+        # Iteratīvā padziļināšana kā Engine.search
+        if limits is None:
+            limits = Limits(MAX_DEPTH, TIME_LIMIT)
+        stats = Stats()
+        start = time.perf_counter()
+        moves = position.getMoves(side)
+        if not moves:
+            return None, None, stats
+
+        if limits.time is None:
+            depths = [MAX_DEPTH if limits.max_depth is None
+                      else limits.max_depth]
+        else:
+            depths = range(DEPTH_LIMIT if limits.max_depth is None
+                           else limits.max_depth + 1)
+
+        deadline = None # Pirmo iterāciju vienmēr pabeidzam
+        best_move = None
+        best_score = None
+        for depth in depths:
+            result = self.searchDepth(position, side, moves, depth, deadline)
+            if result is None:
+                break
+            best_move, score, nodes = result
+            best_score = SIGN[side] * score
+            stats.nodes += nodes
+            stats.depth = depth + 1
+            stats.pv = [best_move]
+
+            # Iepriekšējās iterācijas labāko gājienu pārbaudām pirmo
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+            if limits.time is not None:
+                deadline = time.time() + limits.time - (
+                    time.perf_counter() - start)
+                if time.perf_counter() - start >= limits.time:
+                    break
+
+        stats.elapsed = time.perf_counter() - start
+        return best_move, best_score, stats
+
+
+def benchScaling(depth=12, workers=(1, 2, 4, 8)):
+    # Paātrinājums fiksētā dziļumā pret vienu procesu
+    positions = [
+        engine.Position.fromCells((7, 2), [(0, 1), (0, 3), (0, 5), (0, 7)]),
+        engine.Position.fromCells((5, 2), [(0, 1), (2, 3), (1, 6), (3, 4)]),
+        engine.Position.fromCells((4, 3), [(1, 0), (1, 2), (2, 5), (2, 7)]),
+        engine.Position.fromCells((6, 5), [(2, 1), (3, 2), (2, 5), (1, 6)]),
+    ]
+    base = None
+    for count in workers:
+        with ParallelSearch(count) as searcher:
+            start = time.perf_counter()
+            nodes = 0
+            for position in positions:
+                for side in ("sheep", "wolfs"):
+                    nodes += searcher.search(position, side,
+                                             Limits(depth))[2].nodes
+            elapsed = time.perf_counter() - start
+        if base is None:
+            base = elapsed
+        print(f"{count} workers: {elapsed:.2f}s, {nodes:,} nodes, "
+              f"speedup {base / elapsed:.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Parallel root search scaling benchmark")
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    print(f"{multiprocessing.cpu_count()} CPUs")
+    benchScaling(args.depth, args.workers)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Spēļu ieraksti: sākuma izvietojums un gājienu saraksts
+#
+# Viena spēle - viena teksta rinda:
+#     N vilki sākums rezultāts gājiens gājiens ...
+# sākums - "startpos" vai "kārta:aita:vilks,vilks,..." (piem.
+# wolfs:58:1,3,5,7), rezultāts - sheep, wolfs vai * (nepabeigta),
+# gājiens - šūnu numuri "no-uz" kā servera protokolā (piem. 58-49).
+# Tukšas rindas un rindas, kas sākas ar #, ir komentāri.
+#
+# Piemērs: 8 4 startpos wolfs 58-49 7-14 49-42 ...
+#
+# Grafiskā saskarne katru spēli pievieno failam RECORD_PATH;
+# ierakstu analīze - analyse.py.
+
+import os
+
+import engine
+from engine import Geometry, Position
+
+RECORD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "games.rec")
+RESULTS = {"sheep": "sheep", "wolfs": "wolfs", "*": None}
+
+
+class Record:
+    # Vienas spēles ieraksts
+    # setup - sākuma stāvoklis (Position) vai None - sākumizvietojums,
+    # side - kam pirmais gājiens, result - uzvarētājs vai None
+
+    def __init__(self, geometry, moves=(), result=None, setup=None,
+                 side="sheep"):
+        self.geometry = geometry
+        self.moves = list(moves)
+        self.result = result
+        self.setup = setup
+        self.side = side
+
+    @classmethod
+    def fromGame(cls, game):
+        # Ieraksts no engine.Game; atceltie gājieni neiekļaujas
+        return cls(game.geometry, game.moves, game.winner())
+
+    def startPosition(self):
+        if self.setup is None:
+            return self.geometry.startPosition()
+        return self.setup.copy()
+
+    def positions(self):
+        # Stāvokļi pirms katra gājiena:
+        # (pusgājiens, stāvoklis, kārta, gājiens). Stāvoklis ir viens un
+        # tas pats objekts, saglabāšanai jākopē;
+        # neatļauts gājiens - ValueError
+        position = self.startPosition()
+        side = self.side
+        for ply, move in enumerate(self.moves):
+            if move not in position.getMoves(side):
+                raise ValueError(f"illegal move {move[0]}-{move[1]} "
+                                 f"at ply {ply}")
+            yield ply, position, side, move
+            position.doMove(move)
+            side = engine.OPPONENT[side]
+
+    def format(self):
+        # Ieraksta rinda bez rindas beigām
+        if self.setup is None:
+            setup = "startpos"
+        else:
+            setup = (f"{self.side}:{self.setup.sheepSquare()}:" +
+                     ",".join(map(str, self.setup.wolfSquares())))
+        tokens = [str(self.geometry.n), str(self.geometry.wolf_count), setup,
+                  self.result or "*"]
+        tokens.extend(f"{prev}-{next}" for prev, next in self.moves)
+        return " ".join(tokens)
+
+    @classmethod
+    def parse(cls, line):
+        # Ieraksta rinda -> Record; kļūdains ieraksts - ValueError
+        tokens = line.split()
+        if len(tokens) < 4:
+            raise ValueError("truncated record")
+        size, wolf_count, setup, result = tokens[:4]
+        try:
+            geometry = Geometry.get(int(size), int(wolf_count))
+            moves = [tuple(map(int, token.split("-")))
+                     for token in tokens[4:]]
+        except ValueError as e:
+            raise ValueError(f"bad record: {e}")
+        if any(len(move) != 2 for move in moves):
+            raise ValueError("bad record: move is not from-to")
+        if result not in RESULTS:
+            raise ValueError(f"bad result: {result}")
+
+        position = None
+        side = "sheep"
+        if setup != "startpos":
+            side, _, squares = setup.partition(":")
+            sheep, _, wolfs = squares.partition(":")
+            try:
+                sheep = int(sheep)
+                wolfs = [int(sq) for sq in wolfs.split(",")]
+            except ValueError:
+                raise ValueError(f"bad setup: {setup}")
+            squares = set(wolfs + [sheep])
+            if (side not in engine.OPPONENT
+                    or len(wolfs) != geometry.wolf_count
+                    or len(squares) != len(wolfs) + 1
+                    or not all(0 <= sq < geometry.squares for sq in squares)):
+                raise ValueError(f"bad setup: {setup}")
+            position = Position(sum(1 << sq for sq in wolfs), 1 << sheep,
+                                geometry)
+        return cls(geometry, moves, RESULTS[result], position, side)
+
+
+def readRecords(lines):
+    # Ierakstu rindas no faila vai citas rindu virknes, lasot pa vienai:
+    # (rindas numurs, rinda) bez komentāriem
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield number, line
+
+
+def appendRecord(record, path=RECORD_PATH, comment=None):
+    # Pievienojam ierakstu failam; comment - komentāra rinda pirms tā
+    with open(path, "a") as f:
+        if comment:
+            f.write(f"# {comment}\n")
+        f.write(record.format() + "\n")
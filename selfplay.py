@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Dzinēju konfigurāciju turnīrs bez grafiskās saskarnes
+#
+# Katrs dzinēju pāris spēlē abās lomās (aita / vilki). Lai spēles
+# atšķirtos, pirmie --random-plies pusgājieni ir nejauši (sēkla pēc spēles
+# numura). Spēles notiek procesu pūlā; katras spēles rezultāts tiek
+# izvadīts kā JSON rinda, kopsavilkums - stderr.
+#
+# Piemērs:
+#     python selfplay.py --engine fast:time=0.02 \
+#         --engine deep:depth=6,mode=alphabeta --games 500 > games.jsonl
+#
+# Konfigurācijas atslēgas: depth, time, mode, aspiration, ordering
+# (piem. tt+killers), tt (tabulas izmērs), tablebase (1 - izmantot failu),
+# book (1 - izmantot atklātnes grāmatu book.bin), batch (1 - lapas
+# novērtēt paketēs ar NumPy, sk. batch.py; tikai ar noklusējuma eval),
+# eval (cached - noklusējums, heuristic vai modulis.funkcija ar
+# novērtējuma variantu, kas atgriež veselu skaitli 0..engine.INF)
+
+import argparse
+import importlib
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import engine
+from engine import N, Engine, Geometry, Limits
+
+_engines = {}  # Procesa dzinēji pēc konfigurācijas nosaukuma
+
+
+def parseEngine(text):
+    # "nosaukums:atslēga=vērtība,..." -> (nosaukums, iestatījumi)
+    name, _, options = text.partition(":")
+    config = {}
+    for item in filter(None, options.split(",")):
+        key, _, value = item.partition("=")
+        if key in ("depth", "aspiration", "tt"):
+            config[key] = int(value)
+        elif key == "time":
+            config[key] = float(value)
+        elif key == "ordering":
+            config[key] = [x for x in value.split("+") if x]
+        elif key in ("mode", "eval"):
+            config[key] = value
+        elif key in ("tablebase", "book", "batch"):
+            config[key] = value not in ("", "0")
+        else:
+            raise argparse.ArgumentTypeError(f"unknown engine option: {key}")
+    if config.get("batch") and config.get("eval") not in (None, "cached",
+                                                          "heuristic"):
+        # Paketes novērtē tikai iebūvēto heiristiku (sk. Engine)
+        raise argparse.ArgumentTypeError("batch=1 cannot be combined with "
+                                         f"eval={config['eval']}")
+    return name, config
+
+
+def loadEvaluation(name):
+    # Novērtējuma funkcija pēc nosaukuma; None - dzinēja noklusējums
+    if name in (None, "cached"):
+        return None
+    if name == "heuristic":
+        return engine.heuristic
+    module, _, function = name.rpartition(".")
+    if not module:
+        raise ValueError(f"unknown evaluation: {name}")
+    return getattr(importlib.import_module(module), function)
+
+
+def makeEngine(config):
+    # Dzinējs un meklēšanas ierobežojumi pēc konfigurācijas
+    options = {}
+    if "mode" in config:
+        options["mode"] = config["mode"]
+    if "aspiration" in config:
+        options["aspiration"] = config["aspiration"]
+    if "ordering" in config:
+        options["ordering"] = config["ordering"]
+    if "tt" in config:
+        options["tt_size"] = config["tt"]
+    if config.get("tablebase"):
+        from tablebase import Tablebase
+        options["tablebase"] = Tablebase.load()
+    if config.get("book"):
+        from book import Book
+        options["book"] = Book.load()
+    if config.get("batch"):
+        from batch import evaluateBatch
+        options["batch"] = evaluateBatch
+    options["evaluation"] = loadEvaluation(config.get("eval"))
+    limits = Limits(config.get("depth"), config.get("time"))
+    return Engine(**options), limits
+
+
+def playGame(game, sheep, wolfs, seed, random_plies, size=N, wolf_count=None):
+    # Viena spēle; sheep un wolfs ir (nosaukums, konfigurācija)
+    players = {}
+    for side, (name, config) in (("sheep", sheep), ("wolfs", wolfs)):
+        if name not in _engines:
+            _engines[name] = makeEngine(config)
+        searcher, limits = _engines[name]
+        searcher.clear()
+        players[side] = (name, searcher, limits)
+
+    rng = random.Random(seed)
+    position = Geometry.get(size, wolf_count).startPosition()
+    side = "sheep"
+    plies = 0
+    totals = {side: {"moves": 0, "time": 0.0, "nodes": 0}
+              for side in players}
+    moves = []
+    winner = engine.checkVictory(position)
+    while winner is None:
+        name, searcher, limits = players[side]
+        start = time.perf_counter()
+        if plies < random_plies:
+            move = rng.choice(position.getMoves(side))
+        else:
+            move, score, stats = searcher.search(position, side, limits)
+            totals[side]["moves"] += 1
+            totals[side]["time"] += time.perf_counter() - start
+            totals[side]["nodes"] += stats.nodes
+        position.doMove(move)
+        moves.append(move)
+        plies += 1
+        side = engine.OPPONENT[side]
+        winner = engine.checkVictory(position)
+
+    return {"game": game, "sheep": sheep[0], "wolfs": wolfs[0],
+            "winner": winner, "plies": plies, "seed": seed,
+            "size": size, "wolves": position.geometry.wolf_count,
+            "moves": moves, "stats": totals}
+
+
+def wilson(wins, games, z=1.96):
+    # Uzvaru īpatsvara 95% ticamības intervāls (Vilsona)
+    if not games:
+        return 0.0, 0.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denominator
+    half = z * math.sqrt(p * (1 - p) / games
+                         + z * z / (4 * games * games)) / denominator
+    return center - half, center + half
+
+
+class Summary:
+    # Rezultātu uzkrāšana pa konfigurācijām
+
+    def __init__(self, names):
+        self.rows = {name: {"games": 0, "wins": 0, "moves": 0,
+                            "time": 0.0, "nodes": 0} for name in names}
+
+    def add(self, result):
+        for side in ("sheep", "wolfs"):
+            row = self.rows[result[side]]
+            row["games"] += 1
+            row["wins"] += result["winner"] == side
+            stats = result["stats"][side]
+            row["moves"] += stats["moves"]
+            row["time"] += stats["time"]
+            row["nodes"] += stats["nodes"]
+
+    def report(self, file=sys.stderr):
+        for name, row in self.rows.items():
+            games = row["games"]
+            low, high = wilson(row["wins"], games)
+            moves = max(row["moves"], 1)
+            print(f"{name}: {row['wins']}/{games} wins "
+                  f"({row['wins'] / max(games, 1):.1%}, "
+                  f"95% CI {low:.1%}-{high:.1%}), "
+                  f"{row['time'] / moves * 1000:.1f} ms/move, "
+                  f"{row['nodes'] / moves:,.0f} nodes/move", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Headless self-play tournament between engine configs")
+    parser.add_argument("--engine", type=parseEngine, action="append",
+                        required=True,
+                        help="name:key=value,... (repeat for each config)")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per pairing and side")
+    parser.add_argument("--random-plies", type=int, default=4)
+    parser.add_argument("--size", type=int, default=N, help="board size")
+    parser.add_argument("--wolves", type=int, help="wolf count (size // 2)")
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=argparse.FileType("w"),
+                        default=sys.stdout)
+    args = parser.parse_args()
+
+    engines = args.engine
+    names = [name for name, _ in engines]
+    if len(set(names)) != len(names):
+        parser.error("engine names must be unique")
+    try:
+        Geometry.get(args.size, args.wolves)
+    except ValueError as e:
+        parser.error(str(e))
+    if len(engines) == 1:
+        engines = engines * 2
+    pairings = [(a, b) for a, b in itertools.permutations(engines, 2)
+                if a[0] != b[0]] or [(engines[0], engines[0])]
+
+    summary = Summary(names)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        futures = []
+        game = 0
+        for sheep, wolfs in pairings:
+            for _ in range(args.games):
+                futures.append(pool.submit(playGame, game, sheep, wolfs,
+                    args.seed * 1000003 + game, args.random_plies,
+                    args.size, args.wolves))
+                game += 1
+        for future in as_completed(futures):
+            result = future.result()
+            summary.add(result)
+            args.output.write(json.dumps(result) + "\n")
+            args.output.flush()
+
+    print(f"{len(futures)} games in {time.perf_counter() - start:.1f}s",
+          file=sys.stderr)
+    summary.report()
+
+
+if __name__ == '__main__':
+    main()
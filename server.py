@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Dzinēja serveris daudzām vienlaicīgām spēlēm (UCI līdzīgs rindu protokols)
+#
+# Komandas, viena rindā:
+#     isready                                  -> readyok
+#     position [size N] [wolves K] startpos [moves M ...]
+#              (4 <= N <= 16)
+#     position [size N] [wolves K] sheep SQ wolfs SQ,SQ,... side S
+#              [moves M ...]
+#     go [depth D] [movetime MS]               -> info ..., bestmove M
+#                                              (0 < D; laiks nekad nav
+#                                              garāks par --max-movetime)
+#     stop                                     pabeidzam pašreizējo (vai
+#                                              nākamo) meklēšanu ar pēdējās
+#                                              pabeigtās iterācijas gājienu
+#     quit                                     rindā palikušās meklēšanas
+#                                              atmetam, pašreizējo apturam
+# Šūnas ir numuri row * N + col, gājiens - "no-uz" (piem. 58-49),
+# "bestmove none", ja gājienu nav. Kļūdas: "error ziņojums".
+# info rindā score ir no gājēja viedokļa: "score cp V" (heiristika) vai
+# "score mate P" izšķirtai spēlei (P > 0 - gājējs uzvar pēc P pusgājieniem).
+#
+# Meklēšanas notiek ierobežotā procesu pūlā (--workers). Katrai sesijai ir
+# sava go rinda (--queue); kad tā pilna, sesijas ievadi nelasām, līdz
+# rindā atbrīvojas vieta (backpressure caur TCP logu vai cauruli).
+# Kad klients atvienojas, tāpat kā quit; stdin beigās rindu pabeidzam.
+#
+# Palaišana: python server.py (stdin/stdout) vai python server.py --port 7878
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+import engine
+from engine import (MAX_DEPTH, TIME_LIMIT, DEPTH_LIMIT, INF, WIN, SIGN,
+    Engine, Geometry, Limits, Position)
+
+WORKERS = multiprocessing.cpu_count()
+QUEUE_SIZE = 4      # Neapstrādāto go komandu skaits sesijā
+MIN_SIZE, MAX_SIZE = 4, 16 # Dēļa izmēri kā grafiskās saskarnes dialogā
+MAX_MOVETIME = 10.0 # Ilgākā viena go meklēšana sekundēs, arī ar go depth
+STOP_POLL = 0.005   # Cik bieži procesā pārbaudām stop karodziņu (sekundes)
+
+_engine = None  # Procesa dzinējs; transpozīciju tabula kopīga visām sesijām
+_flags = None   # Kopīgie stop karodziņi pa meklēšanas vietām
+
+
+def _init(flags, tablebase, book):
+    # Procesa inicializācija
+    global _engine, _flags
+    _flags = flags
+    table = None
+    if tablebase:
+        from tablebase import Tablebase
+        table = Tablebase.load()
+    opening = None
+    if book:
+        from book import Book
+        opening = Book.load()
+    _engine = Engine(tablebase=table, book=opening)
+
+
+def _ready():
+    # Tukšs uzdevums, lai process tiktu palaists un inicializēts
+    return True
+
+
+def _watch(slot, done):
+    # Pavediens gaida stop karodziņu, kamēr meklēšana nav beigusies
+    while not done.wait(STOP_POLL):
+        if _flags[slot]:
+            _engine.finish()
+            return
+
+
+def _search(slot, wolfs, sheep, n, wolf_count, side, depth, movetime):
+    # Meklēšana procesā; atgriežam (gājiens, novērtējums, statistika)
+    position = Position(wolfs, sheep, Geometry.get(n, wolf_count))
+    _engine.stopped = _engine.finishing = False
+    done = threading.Event()
+    watcher = threading.Thread(target=_watch, args=(slot, done), daemon=True)
+    watcher.start()
+    try:
+        move, score, stats = _engine.search(position, side,
+                                            Limits(depth, movetime))
+    finally:
+        done.set()
+        watcher.join()
+    if move is None:
+        # Apturēta jau pirmajā iterācijā
+        moves = position.getMoves(side)
+        if moves:
+            move = moves[0]
+    return move, score, stats.asDict()
+
+
+def formatMove(move):
+    return "none" if move is None else f"{move[0]}-{move[1]}"
+
+
+def parseMove(text, position, side):
+    # "no-uz" -> gājiens; pārbaudām, vai tas ir atļauts
+    prev, _, next = text.partition("-")
+    try:
+        move = (int(prev), int(next))
+    except ValueError:
+        raise ValueError(f"bad move: {text}")
+    if move not in position.getMoves(side):
+        raise ValueError(f"illegal move: {text}")
+    return move
+
+
+def parsePosition(tokens):
+    # position komandas argumenti -> (stāvoklis, gājiena kārta)
+    options = {}
+    moves = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "moves":
+            moves = tokens[i + 1:]
+            break
+        if token == "startpos":
+            options[token] = True
+            i += 1
+            continue
+        if token not in ("size", "wolves", "sheep", "wolfs", "side"):
+            raise ValueError(f"unknown position field: {token}")
+        if i + 1 >= len(tokens):
+            raise ValueError(f"missing value for {token}")
+        options[token] = tokens[i + 1]
+        i += 2
+
+    n = int(options.get("size", engine.N))
+    if not MIN_SIZE <= n <= MAX_SIZE:
+        # Tabulas veidojam notikumu cilpā un glabājam visu laiku
+        raise ValueError(f"size must be {MIN_SIZE}..{MAX_SIZE}: {n}")
+    wolf_count = options.get("wolves")
+    geometry = Geometry.get(n, None if wolf_count is None
+                            else int(wolf_count))
+    if "startpos" in options:
+        position = geometry.startPosition()
+        side = "sheep"
+    else:
+        if "sheep" not in options or "wolfs" not in options:
+            raise ValueError("expected startpos or sheep and wolfs")
+        side = options.get("side", "sheep")
+        if side not in SIGN:
+            raise ValueError(f"bad side: {side}")
+        sheep = int(options["sheep"])
+        wolfs = [int(sq) for sq in options["wolfs"].split(",")]
+        squares = [sheep] + wolfs
+        if (len(set(squares)) != len(squares)
+                or len(wolfs) != geometry.wolf_count
+                or not all(0 <= sq < geometry.squares for sq in squares)):
+            raise ValueError("bad piece squares")
+        position = Position(sum(1 << sq for sq in wolfs), 1 << sheep,
+                            geometry)
+
+    for text in moves:
+        position.doMove(parseMove(text, position, side))
+        side = engine.OPPONENT[side]
+    return position, side
+
+
+def parseGo(tokens, max_movetime=MAX_MOVETIME):
+    # go komandas argumenti -> Limits
+    # Laiku vienmēr ierobežojam ar max_movetime: lielā dēlī pat neliels
+    # dziļums var prasīt minūtes, un process būtu aizņemts. Ar laika
+    # ierobežojumu dziļumu sasniedzam iteratīvi; ja laiks beidzas,
+    # atbildam ar pēdējās pabeigtās iterācijas gājienu
+    options = dict(zip(tokens[::2], tokens[1::2]))
+    if len(tokens) % 2 or set(options) - {"depth", "movetime"}:
+        raise ValueError("expected go [depth D] [movetime MS]")
+    depth = int(options["depth"]) if "depth" in options else None
+    if depth is not None:
+        if depth <= 0:
+            raise ValueError(f"depth must be positive: {depth}")
+        # Protokolā dziļums ir pusgājienos līdz lapām kā info rindā,
+        # dzinēja max_depth ir par vienu mazāks (Limits)
+        depth = min(depth, DEPTH_LIMIT) - 1
+    movetime = (int(options["movetime"]) / 1000 if "movetime" in options
+                else None)
+    if depth is None and movetime is None:
+        return Limits(MAX_DEPTH, min(TIME_LIMIT, max_movetime))
+    if movetime is None or movetime > max_movetime:
+        movetime = max_movetime
+    return Limits(depth, movetime)
+
+
+def infoLine(side, score, stats):
+    # Meklēšanas rezultāts info rindā
+    parts = [f"info depth {stats['depth']} seldepth {stats['max_depth']}"]
+    if score is not None:
+        value = SIGN[side] * score
+        if abs(value) > INF:
+            plies = WIN - abs(value)
+            parts.append(f"score mate {plies if value > 0 else -plies}")
+        else:
+            parts.append(f"score cp {value}")
+    parts.append(f"nodes {stats['nodes']} nps {stats['nps']:.0f} "
+                 f"time {stats['elapsed'] * 1000:.0f}")
+    if stats["pv"]:
+        parts.append("pv " + " ".join(formatMove(move)
+                                      for move in stats["pv"]))
+    return " ".join(parts)
+
+
+class Session:
+    # Viena klienta savienojums: spēles stāvoklis, go rinda un izvade
+
+    def __init__(self, server, reader, writer, queue_size=QUEUE_SIZE,
+                 finish_on_eof=False):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.position = engine.DEFAULT.startPosition()
+        self.side = "sheep"
+        self.slot = None        # Pašreizējās meklēšanas vieta pūlā
+        self.stopping = False   # stop pienāca pirms meklēšanas sākuma
+        self.closed = False     # Klients aizgājis, atbildes vairs nerakstām
+        # Ievades beigās rindu pabeidzam (stdin beidzies, stdout vēl lasa)
+        self.finish_on_eof = finish_on_eof
+
+    def write(self, line):
+        self.writer.write(line.encode() + b"\n")
+
+    async def run(self):
+        # Lasām komandas, līdz quit vai savienojuma beigām
+        consumer = asyncio.create_task(self.consume())
+        try:
+            try:
+                while True:
+                    line = await self.reader.readline()
+                    if not line:
+                        if self.finish_on_eof:
+                            await self.queue.join()
+                        break
+                    if not await self.handle(line.decode().split()):
+                        break
+                    await self.writer.drain()
+            except ConnectionError:
+                pass
+            await self.close(consumer)
+        finally:
+            consumer.cancel()
+            if self.slot is not None:
+                self.server.stop(self.slot)
+
+    async def close(self, consumer):
+        # Klients aizgājis: rindā palikušās meklēšanas atmetam, pašreizējo
+        # apturam un gaidām tikai tās beigas, lai pūla vieta atbrīvotos
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+        if self.slot is None:
+            # Meklēšana vēl nav nodota pūlam vai jau beigusies
+            consumer.cancel()
+        else:
+            self.server.stop(self.slot)
+            await self.queue.join()
+
+    async def handle(self, tokens):
+        # Viena komanda; False - sesijas beigas
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        try:
+            if command == "isready":
+                self.write("readyok")
+            elif command == "position":
+                self.position, self.side = parsePosition(args)
+            elif command == "go":
+                # Pilnā rindā gaidām un ievadi vairs nelasām
+                await self.queue.put((self.position.copy(), self.side,
+                                      parseGo(args,
+                                              self.server.max_movetime)))
+            elif command == "stop":
+                if self.slot is not None:
+                    self.server.stop(self.slot)
+                elif not self.queue.empty():
+                    self.stopping = True
+            elif command == "quit":
+                return False
+            else:
+                self.write(f"error unknown command: {command}")
+        except ValueError as e:
+            self.write(f"error {e}")
+        return True
+
+    async def consume(self):
+        # Sesijas meklēšanas pēc kārtas
+        while True:
+            position, side, limits = await self.queue.get()
+            try:
+                move, score, stats = await self.server.search(
+                    self, position, side, limits)
+                if self.closed:
+                    continue
+                self.write(infoLine(side, score, stats))
+                self.write(f"bestmove {formatMove(move)}")
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                self.queue.task_done()
+
+
+class Server:
+    # Procesu pūls un sesiju meklēšanu plānošana
+
+    def __init__(self, workers=WORKERS, queue_size=QUEUE_SIZE,
+                 tablebase=False, book=False, max_movetime=MAX_MOVETIME):
+        self.queue_size = queue_size
+        self.max_movetime = max_movetime
+        # Procesus veido forkserver, nevis fork: fork kopētu stdin bufera
+        # slēdzeni, ko tur StdinReader pavediens, un process iestrēgtu,
+        # aizverot mantoto sys.stdin
+        context = multiprocessing.get_context("forkserver")
+        self.flags = context.Array("b", workers, lock=False)
+        self.pool = ProcessPoolExecutor(workers, mp_context=context,
+                                        initializer=_init,
+                                        initargs=(self.flags, tablebase,
+                                                  book))
+        # Pirmo procesu palaižam uzreiz, pirms stdin lasīšanas pavediena;
+        # inicializācijas kļūdas parādās startējot
+        self.pool.submit(_ready).result()
+        # Vienlaikus pūlam nododam ne vairāk meklēšanu kā ir procesu,
+        # gaidītāji tiek apkalpoti pēc kārtas
+        self.slots = asyncio.Semaphore(workers)
+        self.free = list(range(workers))
+        self.sessions = 0
+        self.searches = 0
+        self.start = time.perf_counter()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def stop(self, slot):
+        self.flags[slot] = 1
+
+    async def search(self, session, position, side, limits):
+        # Meklēšana brīvā pūla vietā
+        async with self.slots:
+            slot = self.free.pop()
+            self.flags[slot] = session.stopping
+            session.stopping = False
+            session.slot = slot
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.pool, _search, slot, position.wolfs, position.sheep,
+                    position.geometry.n, position.geometry.wolf_count, side,
+                    limits.max_depth, limits.time)
+            finally:
+                session.slot = None
+                self.free.append(slot)
+                self.searches += 1
+
+    async def serve(self, reader, writer):
+        # Viens klienta savienojums
+        self.sessions += 1
+        try:
+            await Session(self, reader, writer, self.queue_size).run()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    def report(self, file=sys.stderr):
+        elapsed = time.perf_counter() - self.start
+        print(f"{self.searches} searches in {elapsed:.1f}s "
+              f"({self.searches / elapsed:.1f}/s)", file=file)
+
+
+class StdinReader:
+    # stdin rindas no atsevišķa pavediena (der arī failiem un terminālim)
+    # Ierobežotā rinda aptur lasīšanu tāpat kā TCP sesijā
+
+    def __init__(self, loop, size=QUEUE_SIZE):
+        self.lines = asyncio.Queue(size)
+        threading.Thread(target=self.read, args=(loop,), daemon=True).start()
+
+    def read(self, loop):
+        try:
+            for line in iter(sys.stdin.buffer.readline, b""):
+                asyncio.run_coroutine_threadsafe(self.lines.put(line),
+                                                 loop).result()
+            asyncio.run_coroutine_threadsafe(self.lines.put(b""),
+                                             loop).result()
+        except (CancelledError, RuntimeError):
+            # Sesija jau beigusies (quit), cilpa apstājas vai ir aizvērta
+            pass
+
+    async def readline(self):
+        return await self.lines.get()
+
+
+class StdoutWriter:
+    # Sesijas izvade stdout
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+async def serveStdio(server):
+    # Viena sesija caur stdin/stdout
+    reader = StdinReader(asyncio.get_running_loop(), server.queue_size)
+    await Session(server, reader, StdoutWriter(), server.queue_size,
+                  finish_on_eof=True).run()
+
+
+async def main(args):
+    # SIGTERM apstrādājam kā Ctrl+C, lai procesu pūls tiktu aizvērts
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel)
+    server = Server(args.workers, args.queue, args.tablebase, args.book,
+                    args.max_movetime)
+    try:
+        if args.port is None:
+            await serveStdio(server)
+        else:
+            listener = await asyncio.start_server(server.serve, args.host,
+                                                  args.port)
+            print(f"listening on {args.host}:{args.port} "
+                  f"with {args.workers} workers", file=sys.stderr)
+            async with listener:
+                await listener.serve_forever()
+    finally:
+        server.close()
+        if args.port is not None:
+            server.report()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Engine server over a UCI-like line protocol")
+    parser.add_argument("--port", type=int,
+                        help="TCP port (default: stdin/stdout)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--queue", type=int, default=QUEUE_SIZE,
+                        help="pending go commands per session")
+    parser.add_argument("--max-movetime", type=float, default=MAX_MOVETIME,
+                        help="seconds after which any go answers")
+    parser.add_argument("--tablebase", action="store_true",
+                        help="probe tablebase.bin if it exists")
+    parser.add_argument("--book", action="store_true",
+                        help="play from book.bin in the opening")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
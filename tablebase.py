@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Pilns spēles atrisinājums (galotņu tabula)
+#
+# Vilki kustas tikai uz leju, tāpēc pēc katra vilku gājiena to rindu summa
+# palielinās un spēlē nav ciklu. Stāvokļus atrisinām atpakaļgaitā, sākot
+# no vilku izvietojumiem ar lielāko rindu summu.
+#
+# Faila formāts: galvene (HEADER) un pa vienam baitam katram stāvoklim:
+#     7. bits - uzvar aita, 0.-6. biti - pusgājienu skaits līdz spēles beigām,
+#     0xFF - stāvoklis nav iespējams (aita uz vilka šūnas)
+# Indekss: (vilku kombinācijas colex rangs * tumšo šūnu skaits
+#           + aitas tumšās šūnas indekss) * 2 + gājiena kārta
+#
+# Palaišana: python tablebase.py [fails]
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from itertools import combinations
+
+import engine
+from engine import N, SHEEP_TARGETS, WOLF_TARGETS, TOP_ROW
+
+WOLF_COUNT = N // 2
+TABLEBASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "tablebase.bin")
+
+HEADER = struct.Struct("<4sBBBx")  # Paraksts, versija, N, vilku skaits
+MAGIC = b"SWTB"
+VERSION = 1
+
+SIDES = {"sheep": 0, "wolfs": 1}   # Gājiena kārtas indekss
+SHEEP_WIN = 0x80
+UNKNOWN = 0xFF
+
+# Tumšās šūnas: tikai uz tām var atrasties figūras
+DARK = [sq for sq in range(N * N) if (sq // N + sq % N) % 2]
+DARK_INDEX = {sq: index for index, sq in enumerate(DARK)}
+
+# Binomiālie koeficienti colex rangam
+COMB = [[0] * (WOLF_COUNT + 1) for _ in range(len(DARK) + 1)]
+for _n in range(len(DARK) + 1):
+    COMB[_n][0] = 1
+    for _k in range(1, WOLF_COUNT + 1):
+        COMB[_n][_k] = COMB[_n - 1][_k - 1] + COMB[_n - 1][_k] if _n else 0
+
+
+def wolfRank(wolfs):
+    # Vilku kombinācijas colex rangs: sum C(c_i, i + 1)
+    rank = 0
+    i = 1
+    while wolfs:
+        low = wolfs & -wolfs
+        rank += COMB[DARK_INDEX[low.bit_length() - 1]][i]
+        wolfs ^= low
+        i += 1
+    return rank
+
+
+def index(wolfs, sheep_sq, side):
+    return ((wolfRank(wolfs) * len(DARK) + DARK_INDEX[sheep_sq]) * 2
+            + SIDES[side])
+
+
+def terminal(wolfs, sheep_sq):
+    # Tāpat kā engine.checkVictory: uzvarētāja vērtība vai None
+    if (1 << sheep_sq) & TOP_ROW:
+        return SHEEP_WIN
+    occupied = wolfs | 1 << sheep_sq
+    if all(occupied >> t & 1 for t in SHEEP_TARGETS[sheep_sq]):
+        return 0
+    mask = wolfs
+    while mask:
+        low = mask & -mask
+        for t in WOLF_TARGETS[low.bit_length() - 1]:
+            if not occupied >> t & 1:
+                return None
+        mask ^= low
+    return SHEEP_WIN
+
+
+def best(children, mover_win):
+    # Uzvarētājs izvēlas īsāko uzvaru, zaudētājs - garāko zaudējumu
+    wins = [value for value in children if value & SHEEP_WIN == mover_win]
+    if wins:
+        return mover_win | (min(value & 0x7F for value in wins) + 1)
+    return (mover_win ^ SHEEP_WIN) | (max(value & 0x7F
+                                          for value in children) + 1)
+
+
+def build(path=TABLEBASE_PATH, verbose=True):
+    # Atrisinām visus stāvokļus un ierakstām failā
+    start = time.perf_counter()
+    dark_count = len(DARK)
+    configs = []
+    for combination in combinations(DARK, WOLF_COUNT):
+        wolfs = sum(1 << sq for sq in combination)
+        configs.append((sum(sq // N for sq in combination), wolfs))
+    configs.sort(reverse=True) # Vispirms vilki, kas tikuši vistālāk
+
+    table = bytearray([UNKNOWN]) * (len(configs) * dark_count * 2)
+    for _, wolfs in configs:
+        base = wolfRank(wolfs) * dark_count * 2
+
+        # Vilku gājieni uz jau atrisinātiem izvietojumiem
+        successors = []
+        mask = wolfs
+        while mask:
+            low = mask & -mask
+            sq = low.bit_length() - 1
+            for t in WOLF_TARGETS[sq]:
+                if not wolfs >> t & 1:
+                    successors.append(
+                        (t, wolfRank(wolfs ^ low ^ (1 << t)) * dark_count * 2))
+            mask ^= low
+
+        free = [sq for sq in DARK if not wolfs >> sq & 1]
+
+        # Vilku gājiens
+        for sheep_sq in free:
+            offset = DARK_INDEX[sheep_sq] * 2
+            value = terminal(wolfs, sheep_sq)
+            if value is None:
+                value = best([table[other + offset]
+                              for t, other in successors if t != sheep_sq], 0)
+            table[base + offset + 1] = value
+
+        # Aitas gājiens (uz šī paša izvietojuma vilku gājiena stāvokļiem)
+        for sheep_sq in free:
+            value = terminal(wolfs, sheep_sq)
+            if value is None:
+                value = best([table[base + DARK_INDEX[t] * 2 + 1]
+                              for t in SHEEP_TARGETS[sheep_sq]
+                              if not wolfs >> t & 1], SHEEP_WIN)
+            table[base + DARK_INDEX[sheep_sq] * 2] = value
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, N, WOLF_COUNT))
+        f.write(table)
+
+    if verbose:
+        print(f"{len(table):,} positions written to {path} "
+              f"in {time.perf_counter() - start:.1f}s")
+
+
+class Tablebase:
+    # Galotņu tabulas nolasīšana caur mmap; katrs pieprasījums ir O(1)
+
+    def __init__(self, path=TABLEBASE_PATH):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, wolf_count = HEADER.unpack_from(self.map)
+        if (magic, version, n, wolf_count) != (MAGIC, VERSION, N, WOLF_COUNT):
+            self.close()
+            raise ValueError(f"{path}: tablebase does not match this board")
+
+    @classmethod
+    def load(cls, path=TABLEBASE_PATH):
+        # Atveram tabulu, ja tā ir izveidota, citādi None
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def covers(self, position):
+        # Tabula ir tikai standarta dēlim ar N // 2 vilkiem
+        geometry = position.geometry
+        return ((geometry.n, geometry.wolf_count) == (N, WOLF_COUNT)
+                and position.wolfs.bit_count() == WOLF_COUNT
+                and position.sheepSquare() in DARK_INDEX
+                and all(sq in DARK_INDEX for sq in position.wolfSquares()))
+
+    def probe(self, position, side):
+        # Atgriežam (uzvarētājs, pusgājieni līdz beigām) vai None
+        if not self.covers(position):
+            return None
+        value = self.map[HEADER.size
+                         + index(position.wolfs, position.sheepSquare(), side)]
+        if value == UNKNOWN:
+            return None
+        return ("sheep" if value & SHEEP_WIN else "wolfs"), value & 0x7F
+
+    def bestMove(self, position, side):
+        # Perfektais gājiens: ātrākā uzvara vai ilgākā pretošanās
+        # Atgriežam (gājiens, uzvarētājs, pusgājieni) vai None
+        result = self.probe(position, side)
+        if result is None or result[1] == 0:
+            return None
+        winner, distance = result
+        other = engine.OPPONENT[side]
+        for move in position.getMoves(side):
+            position.doMove(move)
+            child = self.probe(position, other)
+            position.undoMove(move)
+            if child == (winner, distance - 1):
+                return move, winner, distance
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Solve the game and write the tablebase file")
+    parser.add_argument("path", nargs="?", default=TABLEBASE_PATH)
+    args = parser.parse_args()
+    build(args.path)